@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import time
+from email.utils import getaddresses
+
+from googleapiclient.errors import HttpError
+
+from gmail_utils import batch_get_messages, get_header
+
+
+ADDRESS_BOOK_PATH = "recipient_book.json"
+LEGACY_RECIPIENTS_PATH = "recipient_emails.txt"  # flat list written by older versions, imported once
+INITIAL_SENT_LIMIT = 100  # sent messages scanned when the book is first built
+MERGE_INTERVAL = 3600  # seconds between merges of newly sent mail
+
+
+class AddressBook:
+    """
+    Recipient addresses with usage counts and last-used times, persisted to JSON.
+    Sends are recorded immediately; messages sent from elsewhere are merged incrementally from the
+    SENT label's history instead of re-downloading the whole folder.
+    """
+
+    def __init__(self, path: str = ADDRESS_BOOK_PATH, legacy_path: str = LEGACY_RECIPIENTS_PATH):
+        self.path = path
+        self.entries = {}
+        self.history_id = None
+        self.last_merge = 0.0
+        self.recorded_ids = []  # ids of sends already recorded locally, skipped by the next merge
+        self._lock = threading.Lock()
+        self._merge_thread = None
+        self._listeners = []
+        self._load(legacy_path)
+
+    def _load(self, legacy_path: str):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.entries = data.get('entries', {})
+                self.history_id = data.get('history_id')
+                self.last_merge = data.get('last_merge', 0.0)
+                self.recorded_ids = data.get('recorded_ids', [])
+                return
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Could not load address book from {self.path}: {e}")
+        if legacy_path and os.path.exists(legacy_path):
+            with open(legacy_path, 'r') as f:
+                for line in f:
+                    for _, address in getaddresses([line.strip()]):
+                        self._add(address, 0.0)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries, 'history_id': self.history_id, 'last_merge': self.last_merge,
+                       'recorded_ids': self.recorded_ids}, f)
+        os.replace(tmp_path, self.path)
+
+    def _add(self, address: str, used_at: float) -> bool:
+        """Count one use of an address; returns True if the address is new to the book."""
+        address = address.strip()
+        if '@' not in address:
+            return False
+        key = address.lower()
+        entry = self.entries.get(key)
+        is_new = entry is None
+        if is_new:
+            entry = self.entries[key] = {'address': address, 'count': 0, 'last_used': 0.0}
+        entry['count'] += 1
+        entry['last_used'] = max(entry['last_used'], used_at)
+        return is_new
+
+    def add_listener(self, callback):
+        """callback(address) is called for every address added to the book, e.g. to update a search index."""
+        self._listeners.append(callback)
+
+    def _notify(self, addresses: list):
+        for address in addresses:
+            for callback in self._listeners:
+                callback(address)
+
+    def record(self, recipients: str, message_id: str = None, used_at: float = None):
+        """
+        Record a send to one or more recipients (a To header value) right away.
+        Passing the sent message's id keeps the next merge from counting it a second time.
+        """
+        used_at = used_at or time.time()
+        with self._lock:
+            new = [address for _, address in getaddresses([recipients]) if self._add(address, used_at)]
+            if message_id:
+                self.recorded_ids.append(message_id)
+            self._save()
+        self._notify(new)
+
+    def addresses(self) -> list:
+        with self._lock:
+            return [entry['address'] for entry in self.entries.values()]
+
+    def get(self, address: str) -> dict | None:
+        with self._lock:
+            entry = self.entries.get(address.lower())
+            return dict(entry) if entry else None
+
+    def _record_messages(self, messages: list) -> list:
+        new = []
+        for msg in messages:
+            if msg['id'] in self.recorded_ids:
+                continue
+            used_at = int(msg.get('internalDate', 0)) / 1000
+            recipients = [get_header(msg, 'To', ''), get_header(msg, 'Cc', '')]
+            new += [address for _, address in getaddresses(recipients) if self._add(address, used_at)]
+        return new
+
+    def merge_sent(self, service):
+        """
+        Merge messages sent since the last merge, found through the SENT label's history.
+        The first merge scans the most recent sent messages instead.
+        """
+        with self._lock:
+            start_history_id = self.history_id
+        message_ids = []
+
+        if start_history_id is not None:
+            try:
+                page_token = None
+                while True:
+                    response = service.users().history().list(
+                        userId='me', startHistoryId=start_history_id, labelId='SENT',
+                        historyTypes=['messageAdded'], pageToken=page_token
+                    ).execute()
+                    for record in response.get('history', []):
+                        message_ids += [added['message']['id'] for added in record.get('messagesAdded', [])]
+                    latest_history_id = response.get('historyId', start_history_id)
+                    page_token = response.get('nextPageToken')
+                    if not page_token:
+                        break
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                # The stored historyId has expired; rescan recent sent mail.
+                start_history_id = None
+                message_ids = []
+
+        if start_history_id is None:
+            latest_history_id = service.users().getProfile(userId='me').execute()['historyId']
+            results = service.users().messages().list(userId='me', labelIds=['SENT'], maxResults=INITIAL_SENT_LIMIT).execute()
+            message_ids = [message['id'] for message in results.get('messages', [])]
+
+        message_ids = list(dict.fromkeys(message_ids))
+        messages = batch_get_messages(service, message_ids, metadata_headers=('To', 'Cc'))
+        with self._lock:
+            new = self._record_messages(list(messages.values()))
+            self.recorded_ids = []
+            self.history_id = str(latest_history_id)
+            self.last_merge = time.time()
+            self._save()
+        self._notify(new)
+        print(f"Address book merged {len(message_ids)} sent messages.")
+
+    def merge_in_background(self, service_factory, force: bool = False):
+        """Merge sent mail on a daemon thread if the last merge is older than MERGE_INTERVAL."""
+        if not force and time.time() - self.last_merge < MERGE_INTERVAL:
+            return None
+        if self._merge_thread and self._merge_thread.is_alive():
+            return self._merge_thread
+
+        def run():
+            try:
+                self.merge_sent(service_factory())
+            except Exception as e:
+                print(f"Address book merge failed: {e}")
+
+        self._merge_thread = threading.Thread(target=run, daemon=True)
+        self._merge_thread.start()
+        return self._merge_thread
@@ -0,0 +1,19 @@
+import queue
+
+
+_pending = queue.Queue()
+
+
+def announce(text: str):
+    """Queue a message from a background thread to be spoken by the main loop between commands."""
+    _pending.put(text)
+
+
+def drain() -> list:
+    """Return and clear the queued announcements, oldest first."""
+    messages = []
+    while True:
+        try:
+            messages.append(_pending.get_nowait())
+        except queue.Empty:
+            return messages
@@ -0,0 +1 @@
+"""Benchmarks for the assistant hot paths, run against a local Ollama stand-in."""
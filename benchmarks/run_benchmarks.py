@@ -0,0 +1,137 @@
+"""
+Benchmark the assistant's hot paths against the local Ollama stand-in.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --iterations 50 --first-token-ms 100 --token-ms 10
+
+Results are written as JSON so runs from different commits can be diffed.
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import time
+
+import ollama_llm
+from ollama_client import OllamaClient, set_client
+from intent_rules import match_intent
+from replay_commands import latency_stats
+from benchmarks.stub_ollama import StubConfig, StubOllamaServer
+
+
+RULE_COMMANDS = [
+    "open notepad",
+    "close chrome",
+    "read unread emails from google",
+    "how many unread emails do i have",
+    "list my reminders",
+    "read my notifications",
+    "exit",
+]
+LLM_COMMANDS = [
+    "send an email to alice saying the meeting moved",
+    "remind me to call mom tomorrow at 6 pm",
+    "send a whatsapp message to john saying hi",
+    "what is the tallest mountain in the world",
+]
+FALLBACK_COMMANDS = [
+    "check unread emails from github",
+    "how many unread emails are waiting",
+    "play some music",
+]
+
+
+def _time(func, items: list, iterations: int) -> dict:
+    latencies = []
+    for _ in range(iterations):
+        for item in items:
+            start = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - start)
+    return latency_stats(latencies)
+
+
+def _time_first_sentence(question: str) -> float:
+    start = time.perf_counter()
+    stream = ollama_llm.stream_ollama_sentences(question)
+    try:
+        next(stream, None)
+    finally:
+        stream.close()
+    return time.perf_counter() - start
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(iterations: int, config: StubConfig) -> dict:
+    server = StubOllamaServer(config=config).start()
+    set_client(OllamaClient(host=server.url))
+
+    # Keep benchmark runs from reading or polluting the on-disk cache and example file.
+    ollama_llm.intent_cache.path = None
+    ollama_llm.intent_cache.clear()
+    ollama_llm.INTENT_EXAMPLES_PATH = None
+
+    results = {}
+    try:
+        results["get_ollama_response"] = _time(ollama_llm.get_ollama_response, LLM_COMMANDS[-1:], iterations)
+        results["stream_first_sentence"] = latency_stats(
+            [_time_first_sentence(LLM_COMMANDS[-1]) for _ in range(iterations)]
+        )
+        results["analyze_llm_path"] = _time(ollama_llm._analyze_command_uncached, LLM_COMMANDS, iterations)
+        # After the first pass every command is served by the cache.
+        results["analyze_cached_path"] = _time(ollama_llm.analyze_command_with_ollama, LLM_COMMANDS, iterations)
+        results["intent_dispatch_rules"] = _time(match_intent, RULE_COMMANDS, iterations * 100)
+        results["intent_dispatch_classifier"] = _time(
+            ollama_llm.intent_classifier.classify, RULE_COMMANDS + LLM_COMMANDS, iterations * 10
+        )
+        results["fallback_regex"] = _time(ollama_llm._fallback_intent, FALLBACK_COMMANDS, iterations * 100)
+    finally:
+        server.stop()
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "iterations": iterations,
+        "stub": {
+            "first_token_ms": config.first_token_ms,
+            "token_ms": config.token_ms,
+            "load_ms": config.load_ms,
+            "requests_served": server.requests,
+            "streams_cancelled_early": server.cancelled,
+        },
+        "results": results,
+        "intent_cache": ollama_llm.intent_cache.stats(),
+        "ollama_metrics": ollama_llm.get_ollama_metrics(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the assistant's Ollama and intent paths.")
+    parser.add_argument("--output", default="bench_output.json", help="where to write the JSON results")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=20.0)
+    parser.add_argument("--token-ms", type=float, default=2.0)
+    parser.add_argument("--load-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StubConfig(first_token_ms=args.first_token_ms, token_ms=args.token_ms, load_ms=args.load_ms)
+    report = run_benchmarks(args.iterations, config)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in report["results"].items():
+        print(f"{name:28s} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  p99 {stats['p99_ms']:9.3f} ms")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the Ollama HTTP API, used by the benchmarks.
+
+Serves /api/generate in both streaming (NDJSON) and non-streaming mode with configurable latency and
+canned responses, so the assistant's Ollama paths can be timed without a model.
+
+Usage:
+    python -m benchmarks.stub_ollama --port 11500 --first-token-ms 50 --token-ms 5
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_INTENT = {"intent": "answer_question", "entities": {"question": "what is the weather"}}
+DEFAULT_ANSWER = (
+    "This is a canned answer from the benchmark stub. It has a few sentences so streaming can be measured. "
+    "Each sentence arrives token by token. The last one ends here."
+)
+
+# Canned intents for JSON-format requests, picked by the first keyword found in the command line.
+CANNED_INTENTS = {
+    "email": {"intent": "send_email", "entities": {"recipient": "Alice", "subject": "update", "body": "see you"}},
+    "remind": {"intent": "set_reminder", "entities": {"date": "tomorrow", "time": "5 PM", "note": "buy milk"}},
+    "whatsapp": {"intent": "send_whatsapp_message", "entities": {"contact": "John", "message": "hello"}},
+    "type": {"intent": "type_into_application", "entities": {"text_to_type": "hello", "target_app": "notepad"}},
+}
+
+
+class StubConfig:
+    def __init__(self, first_token_ms: float = 20.0, token_ms: float = 2.0, load_ms: float = 0.0,
+                 answer: str = DEFAULT_ANSWER, intents: dict = None, trailing_tokens: int = 50):
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.load_ms = load_ms
+        self.answer = answer
+        self.intents = intents if intents is not None else dict(CANNED_INTENTS)
+        # JSON-mode responses are padded with whitespace tokens, as Ollama does until num_predict runs out.
+        self.trailing_tokens = trailing_tokens
+
+
+def _tokens(text: str) -> list:
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.path != "/api/generate":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests += 1
+
+        config = self.server.config
+        if not payload.get("prompt"):
+            # Model load request: no generation.
+            self._send_json({"model": payload.get("model"), "response": "", "done": True,
+                             **self._durations(config, 0, 0)})
+            return
+
+        text = self._response_text(payload, config)
+        tokens = _tokens(text)
+        if payload.get("format") == "json":
+            tokens += [" "] * config.trailing_tokens
+        num_predict = payload.get("options", {}).get("num_predict")
+        if num_predict:
+            tokens = tokens[:num_predict]
+
+        if payload.get("stream", True):
+            self._stream(tokens, payload, config)
+        else:
+            time.sleep((config.first_token_ms + config.token_ms * len(tokens)) / 1000)
+            self._send_json({"model": payload.get("model"), "response": "".join(tokens), "done": True,
+                             **self._durations(config, len(payload.get("prompt", "")) // 4, len(tokens))})
+
+    def _response_text(self, payload: dict, config: StubConfig) -> str:
+        if payload.get("format") != "json":
+            return config.answer
+        command = payload.get("prompt", "").lower()
+        for keyword, intent in config.intents.items():
+            if keyword in command:
+                return json.dumps(intent)
+        return json.dumps(DEFAULT_INTENT)
+
+    def _durations(self, config: StubConfig, prompt_tokens: int, tokens: int) -> dict:
+        return {
+            "total_duration": int((config.load_ms + config.first_token_ms + config.token_ms * tokens) * 1e6),
+            "load_duration": int(config.load_ms * 1e6),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(config.first_token_ms * 1e6),
+            "eval_count": tokens,
+            "eval_duration": int(config.token_ms * tokens * 1e6),
+        }
+
+    def _send_json(self, data: dict):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, tokens: list, payload: dict, config: StubConfig):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            time.sleep(config.first_token_ms / 1000)
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(config.token_ms / 1000)
+                line = {"model": payload.get("model"), "response": token, "done": False}
+                self._write_chunk((json.dumps(line) + "\n").encode("utf-8"))
+            final = {"model": payload.get("model"), "response": "", "done": True,
+                     **self._durations(config, len(payload.get("prompt", "")) // 4, len(tokens))}
+            self._write_chunk((json.dumps(final) + "\n").encode("utf-8"))
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading early, e.g. once the intent JSON object closed.
+            self.server.cancelled += 1
+            self.close_connection = True
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, config: StubConfig = None):
+        super().__init__(("127.0.0.1", port), StubOllamaHandler)
+        self.config = config or StubConfig()
+        self.requests = 0
+        self.cancelled = 0
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Ollama API.")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--first-token-ms", type=float, default=20.0)
+    parser.add_argument("--token-ms", type=float, default=2.0)
+    parser.add_argument("--load-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StubConfig(first_token_ms=args.first_token_ms, token_ms=args.token_ms, load_ms=args.load_ms)
+    server = StubOllamaServer(port=args.port, config=config)
+    print(f"Stub Ollama API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Create many reminders at once from a CSV file, using Calendar batch requests.
+
+Usage:
+    python bulk_reminders.py medication.csv
+    python bulk_reminders.py deadlines.csv --dry-run --output results.jsonl
+
+The CSV needs a header row with the columns date, time and note, and may add repeat, count and until:
+    date,time,note,repeat,count,until
+    01-09-2025,08:00,Take vitamin D,daily,30,
+    15-09-2025,17:30,Submit report,,,
+    02-09-2025,09:00,Team sync,weekdays,,31-12-2025
+
+Dates are DD-MM-YYYY (or YYYY-MM-DD), times 24-hour HH:MM (or 5:30 PM). repeat is daily, weekly,
+weekdays, monthly or yearly, or a full RRULE:... line; count and until bound the repetition.
+Recurring reminders become one recurring event rather than one event per occurrence.
+"""
+import argparse
+import csv
+import json
+import re
+from datetime import datetime, timedelta
+
+from reminder import authenticate_google_calendar, build_reminder_event, reminder_store, time_parser
+
+
+CALENDAR_BATCH_SIZE = 50  # Calendar accepts up to 1000 calls per batch; 50 keeps clear of rate limits
+DATE_FORMATS = ("%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y")
+TIME_FORMATS = ("%H:%M", "%I:%M %p", "%I %p")
+REPEAT_RULES = {
+    "daily": "FREQ=DAILY",
+    "weekly": "FREQ=WEEKLY",
+    "weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "monthly": "FREQ=MONTHLY",
+    "yearly": "FREQ=YEARLY",
+}
+MAX_SUMMARY_LENGTH = 1024
+_RRULE = re.compile(r"^RRULE:FREQ=(?:SECONDLY|MINUTELY|HOURLY|DAILY|WEEKLY|MONTHLY|YEARLY)(?:;[A-Z]+=[A-Z0-9,+\-:]+)*$")
+# Longest gap between occurrences of a simple rule, to bound when a COUNT-limited repetition ends.
+FREQ_PERIODS = {
+    "SECONDLY": timedelta(seconds=1), "MINUTELY": timedelta(minutes=1), "HOURLY": timedelta(hours=1),
+    "DAILY": timedelta(days=1), "WEEKLY": timedelta(weeks=1), "MONTHLY": timedelta(days=31),
+    "YEARLY": timedelta(days=366),
+}
+
+
+def _parse(value: str, formats: tuple) -> datetime | None:
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def load_csv(path: str) -> list:
+    """Rows of the CSV as dicts with lower-case column names and the source line number under 'line'."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        rows = []
+        for row in reader:
+            if not any((value or "").strip() for value in row.values()):
+                continue
+            cleaned = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+            cleaned["line"] = reader.line_num
+            rows.append(cleaned)
+        return rows
+
+
+def _recurrence(row: dict) -> tuple:
+    """(RRULE lines, error) for the repeat, count and until columns."""
+    repeat = row.get("repeat", "")
+    if not repeat:
+        if row.get("count") or row.get("until"):
+            return None, "count and until need a repeat"
+        return None, None
+    if repeat.upper().startswith("RRULE:"):
+        rule = repeat.upper()
+    elif repeat.lower() in REPEAT_RULES:
+        rule = "RRULE:" + REPEAT_RULES[repeat.lower()]
+    else:
+        return None, f"unknown repeat '{repeat}'"
+
+    if row.get("count"):
+        if not row["count"].isdigit() or int(row["count"]) < 1:
+            return None, f"invalid count '{row['count']}'"
+        rule += f";COUNT={int(row['count'])}"
+    if row.get("until"):
+        until = _parse(row["until"], DATE_FORMATS)
+        if until is None:
+            return None, f"invalid until date '{row['until']}'"
+        rule += f";UNTIL={until.strftime('%Y%m%d')}T235959Z"
+    if ";COUNT=" in rule and ";UNTIL=" in rule:
+        return None, "use either count or until, not both"
+    if not _RRULE.match(rule):
+        return None, f"invalid RRULE '{rule}'"
+    return [rule], None
+
+
+def _last_occurrence_bound(start: datetime, rule: str) -> datetime | None:
+    """
+    A time no earlier than the rule's last occurrence, or None if the rule repeats forever or is too complex to
+    bound. UNTIL is read as UTC end of day, which is late enough for any timezone.
+    """
+    parts = dict(part.split("=", 1) for part in rule[len("RRULE:"):].split(";"))
+    if "UNTIL" in parts:
+        until = _parse(parts["UNTIL"][:8], ("%Y%m%d",))
+        return until + timedelta(days=1) if until else None
+    by_parts = {key for key in parts if key.startswith("BY")}
+    # Only rules with at least one occurrence per period can be bounded from COUNT.
+    if "COUNT" not in parts or by_parts - ({"BYDAY"} if parts["FREQ"] == "WEEKLY" else set()):
+        return None
+    interval = int(parts.get("INTERVAL", "1") or 1)
+    return start + FREQ_PERIODS[parts["FREQ"]] * interval * int(parts["COUNT"])
+
+
+def validate(row: dict, now: datetime = None) -> tuple:
+    """Check one row locally. Returns (reminder, None) or (None, error message)."""
+    now = now or time_parser.now()
+    note = row.get("note", "")
+    if not note:
+        return None, "missing note"
+    if len(note) > MAX_SUMMARY_LENGTH:
+        return None, "note is too long"
+    date = _parse(row.get("date", ""), DATE_FORMATS)
+    if date is None:
+        return None, f"invalid date '{row.get('date', '')}'"
+    time_of_day = _parse(row.get("time", "").upper(), TIME_FORMATS)
+    if time_of_day is None:
+        return None, f"invalid time '{row.get('time', '')}'"
+    start = datetime.combine(date.date(), time_of_day.time())
+
+    recurrence, error = _recurrence(row)
+    if error:
+        return None, error
+    if start < now:
+        if not recurrence:
+            return None, "date is in the past"
+        last = _last_occurrence_bound(start, recurrence[0])
+        if last is not None and last < now:
+            return None, "the repetition ends in the past"
+    return {"line": row.get("line"), "note": note, "start": start, "recurrence": recurrence}, None
+
+
+def create_reminders(service, reminders: list, store=None, chunk_size: int = CALENDAR_BATCH_SIZE) -> list:
+    """
+    Insert validated reminders through Calendar batch requests, chunk_size events per HTTP call.
+    Returns one result dict per reminder, in order, with the created event id or the error.
+    """
+    results = [{"line": reminder["line"], "note": reminder["note"], "ok": False, "event_id": None, "error": None}
+               for reminder in reminders]
+    created = []
+
+    def callback(request_id, response, exception):
+        result = results[int(request_id)]
+        if exception is not None:
+            result["error"] = str(exception)
+            return
+        result["ok"] = True
+        result["event_id"] = response.get("id")
+        created.append((int(request_id), response))
+
+    for start in range(0, len(reminders), chunk_size):
+        batch = service.new_batch_http_request(callback=callback)
+        for index in range(start, min(start + chunk_size, len(reminders))):
+            reminder = reminders[index]
+            body = build_reminder_event(reminder["start"], reminder["note"], reminder["recurrence"])
+            batch.add(service.events().insert(calendarId='primary', body=body), request_id=str(index))
+        try:
+            batch.execute()
+        except Exception as e:
+            # The whole HTTP call failed; every reminder in this chunk without a response gets the error.
+            for index in range(start, min(start + chunk_size, len(reminders))):
+                if not results[index]["ok"] and results[index]["error"] is None:
+                    results[index]["error"] = str(e)
+
+    if store is not None and created:
+        if any(reminders[index]["recurrence"] for index, _ in created):
+            # The store holds single instances; let a sync expand the recurring events.
+            store.sync(service)
+        else:
+            for _, event in created:
+                store.upsert(event)
+    return results
+
+
+def import_reminders(rows: list, service=None, store=None, dry_run: bool = False) -> list:
+    """Validate rows and create the valid ones; returns a result per row, in CSV order."""
+    results = []
+    valid = []
+    for row in rows:
+        reminder, error = validate(row)
+        if error:
+            results.append({"line": row.get("line"), "note": row.get("note", ""), "ok": False, "event_id": None,
+                            "error": error})
+        else:
+            results.append(None)
+            valid.append((len(results) - 1, reminder))
+
+    if dry_run:
+        for index, reminder in valid:
+            results[index] = {"line": reminder["line"], "note": reminder["note"], "ok": True, "event_id": None,
+                              "error": None}
+        return results
+
+    created = create_reminders(service, [reminder for _, reminder in valid], store=store) if valid else []
+    for (index, _), result in zip(valid, created):
+        results[index] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create many reminders from a CSV file with Calendar batch requests.")
+    parser.add_argument("csv", help="CSV file with date, time and note columns (and optional repeat, count, until)")
+    parser.add_argument("--dry-run", action="store_true", help="only validate the rows")
+    parser.add_argument("--output", help="optional file to write the per-row results to as JSON lines")
+    args = parser.parse_args()
+
+    rows = load_csv(args.csv)
+    service = None if args.dry_run else authenticate_google_calendar()
+    results = import_reminders(rows, service=service, store=reminder_store, dry_run=args.dry_run)
+
+    for result in results:
+        status = "ok" if result["ok"] else f"error: {result['error']}"
+        print(f"line {result['line']}: {result['note']} - {status}")
+    succeeded = sum(result["ok"] for result in results)
+    print(f"{succeeded} of {len(results)} reminders {'valid' if args.dry_run else 'created'}.")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,37 @@
-import os
-import pickle
 import base64
 import re
+from collections import Counter
 import pyttsx3
 import speech_recognition as sr
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-import Levenshtein
-from bs4 import BeautifulSoup # Added for parsing HTML email bodies
+from google_service import GoogleServiceProvider
+from gmail_utils import batch_get_messages, batch_modify, count_by_sender, get_header, label_counts, list_message_ids
+from mail_body import extract_snippet
+from mail_index import MailIndex
+from mail_prefetch import UnreadPrefetcher
+from address_book import AddressBook
+from recipient_index import RecipientIndex
+from outbox import Outbox
+from announcements import announce
 
 
+NEWSLETTER_QUERY = 'in:inbox category:promotions'  # Gmail's own classification; a bare 'unsubscribe' also hits receipts
+COUNT_CAP = 5000  # most unread messages fetched for the per-sender breakdown
+TOP_SENDERS = 5  # senders read out individually; the rest are summarised
+
 SCOPES = ['https://www.googleapis.com/auth/gmail.send', 'https://www.googleapis.com/auth/gmail.readonly','https://www.googleapis.com/auth/gmail.modify']
 
 
 engine = pyttsx3.init()
 recognizer = sr.Recognizer()
+mail_index = MailIndex()
+address_book = AddressBook()
+recipient_index = RecipientIndex(usage=address_book.get)
+recipient_index.add_all(address_book.addresses())
+address_book.add_listener(recipient_index.add)
+gmail_provider = GoogleServiceProvider('gmail', 'v1', SCOPES, 'token.pickle', 'credentials.json')
+outbox = Outbox()
 
 def speak(text):
     """Convert text to speech."""
@@ -51,79 +65,43 @@ def is_valid_email(email):
     return re.match(email_regex, email) is not None
 
 def gmail_authenticate():
-    creds = None
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            creds = pickle.load(token)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
-    service = build('gmail', 'v1', credentials=creds)
-    return service
+    """Return the cached Gmail service for this thread; credentials are loaded once and refreshed before expiry."""
+    return gmail_provider.service()
 
-def send_email(service, to, subject, body):
+def build_message(to, subject, body):
     message = MIMEMultipart()
     message['to'] = to
     message['subject'] = subject
     message.attach(MIMEText(body, 'plain'))
+    return message
+
+def send_email(service, to, subject, body):
+    """Send right away on the calling thread; voice_send_mail queues through the outbox instead."""
+    message = build_message(to, subject, body)
     raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
     message_body = {'raw': raw}
-    service.users().messages().send(userId='me', body=message_body).execute()
+    return service.users().messages().send(userId='me', body=message_body).execute()
 
 def fetch_recipient_emails(service):
-    """Fetch recipient emails from sent messages and save to a file."""
-    results = service.users().messages().list(userId='me', labelIds=['SENT'], maxResults=100).execute()
-    messages = results.get('messages', [])
-
-    recipient_emails = set()  
+    """Merge recipients of newly sent messages into the address book."""
+    address_book.merge_sent(service)
 
-    if not messages:
-        print("No sent messages found.")
-    else:
-        for message in messages:
-            msg = service.users().messages().get(userId='me', id=message['id'], format='full').execute()
-            headers = msg['payload']['headers']
-            for header in headers:
-                if header['name'] == 'To':
-                    recipients = header['value'].split(',')
-                    for recipient in recipients:
-                        recipient_emails.add(recipient.strip())  
+def load_recipient_emails():
+    """Load recipient emails from the address book."""
+    return address_book.addresses()
 
-    
-    with open('recipient_emails.txt', 'w') as f:
-        for email in recipient_emails:
-            f.write(email + '\n')
-    print("Recipient emails saved to recipient_emails.txt")
+def find_closest_emails(input_email, k=3):
+    """Return up to k known addresses close to input_email as (address, distance), most likely first."""
+    return recipient_index.search(input_email, k)
 
-def load_recipient_emails():
-    """Load recipient emails from a file."""
-    if os.path.exists('recipient_emails.txt'):
-        with open('recipient_emails.txt', 'r') as f:
-            return [line.strip() for line in f.readlines()]
-    return []
-
-def find_closest_email(input_email, recipient_emails):
-    """Find the email address with the highest similarity using Levenshtein distance."""
-    best_match = None
-    min_distance = float('inf')  
-    for email in recipient_emails:
-        distance = Levenshtein.distance(input_email, email)
-        
-        
-        if distance < min_distance:
-            min_distance = distance
-            best_match = email
-    return best_match
+def find_closest_email(input_email):
+    """Find the closest known address to input_email, or None if nothing is close enough."""
+    matches = find_closest_emails(input_email, k=1)
+    return matches[0][0] if matches else None
 
 
 def voice_send_mail(to: str = None, subject: str = None, body: str = None):
     speak("Let's send an email.")
-    service = gmail_authenticate() 
   
     if not to:
         speak("Who do you want to send the email to?")
@@ -133,17 +111,21 @@ def voice_send_mail(to: str = None, subject: str = None, body: str = None):
             return
 
         to = convert_speech_to_email_format(to_input)
-        recipient_emails = load_recipient_emails()  
-        closest_email = find_closest_email(to, recipient_emails)
-        print(closest_email)
-        if closest_email:
-            speak(f"Did you mean {closest_email}?")
-            confirmation = get_audio("Say yes to confirm or no to provide a different email.")
-            if confirmation and "yes" in confirmation:
-                to = closest_email
+        candidates = find_closest_emails(to)
+        print(candidates)
+        if candidates:
+            for closest_email, _ in candidates:
+                speak(f"Did you mean {closest_email}?")
+                confirmation = get_audio("Say yes to confirm or no to provide a different email.")
+                if confirmation and "yes" in confirmation:
+                    to = closest_email
+                    break
             else:
                 speak("Please say the full email address of the recipient again.")
                 return
+        elif not is_valid_email(to):
+            speak("I couldn't find a matching email address. Please say the full email address of the recipient again.")
+            return
     else:
        
         if not is_valid_email(to):
@@ -169,13 +151,59 @@ def voice_send_mail(to: str = None, subject: str = None, body: str = None):
     confirmation = get_audio("Say yes to send or no to cancel.")
     
     if confirmation and "yes" in confirmation:
-        send_email(service, to, subject, body)
-        speak("Email sent successfully.")
-
-        fetch_recipient_emails(service)
+        # The outbox worker sends it in the background and reports back through _on_outbox_result.
+        outbox.enqueue(build_message(to, subject, body))
+        speak("Email queued. I'll let you know when it's sent.")
     else:
         speak("Email cancelled.")
 
+def _on_outbox_result(entry, error):
+    if error:
+        announce(f"I couldn't send your email to {entry['recipients']}.")
+        return
+    announce(f"Your email to {entry['recipients']} was sent.")
+    address_book.record(entry['recipients'], message_id=entry['sent_id'])
+    # Pick up mail sent from other devices now and then.
+    address_book.merge_in_background(gmail_authenticate)
+
+outbox.add_listener(_on_outbox_result)
+
+def start_outbox():
+    """Send queued mail, including any left over from a previous run, on a background thread."""
+    return outbox.start(gmail_authenticate)
+
+def _unread_headers(service, query='is:unread', sender_filter=None, limit=5):
+    """Newest unread messages matching the query as dicts with id, sender and subject."""
+    if mail_index.is_ready():
+        # Answered from the local index, kept current by the background history sync.
+        return mail_index.unread_messages(sender_filter, limit=limit)
+    results = service.users().messages().list(userId='me', q=query, maxResults=limit).execute()
+    messages = results.get('messages', [])
+    # Headers for all matches in one batch; full bodies only for each message as it is read aloud.
+    metadata = batch_get_messages(service, [message['id'] for message in messages])
+    for message in messages:
+        msg = metadata.get(message['id'], {})
+        message['sender'] = get_header(msg, 'From', "Unknown Sender")
+        message['subject'] = get_header(msg, 'Subject', "No Subject")
+    return messages
+
+def _unread_total(service):
+    return label_counts(service, 'UNREAD').get('messagesUnread', 0)
+
+unread_prefetcher = UnreadPrefetcher(gmail_authenticate, _unread_headers, _unread_total)
+
+def start_unread_prefetch():
+    """Keep the unread list, count and latest bodies warm on a background timer so mail commands start at once."""
+    return unread_prefetcher.start()
+
+def prefetch_unread(force=False):
+    """Refresh the prefetched unread mail in the background, e.g. right after an email action changed it."""
+    return unread_prefetcher.prefetch(force)
+
+def start_mail_index_sync():
+    """Keep the local mail index current on a background thread."""
+    return mail_index.start_background_sync(gmail_authenticate)
+
 def read_unread_emails(sender_filter: str = None, email_filter: str = None):
     """
     Reads unread emails, optionally filtered by sender name or email.
@@ -188,9 +216,11 @@ def read_unread_emails(sender_filter: str = None, email_filter: str = None):
     if email_filter:
         query += f' from:{email_filter}'
 
+    to_mark = []  # marked as read together in one batchModify once reading is done
     try:
-        results = service.users().messages().list(userId='me', q=query, maxResults=5).execute() # Limit to 5 for brevity
-        messages = results.get('messages', [])
+        messages = unread_prefetcher.unread_messages(sender_filter or email_filter, limit=5)
+        if messages is None:
+            messages = _unread_headers(service, query, sender_filter or email_filter, limit=5) # Limit to 5 for brevity
 
         if not messages:
             speak("You have no unread emails matching your criteria.")
@@ -198,36 +228,13 @@ def read_unread_emails(sender_filter: str = None, email_filter: str = None):
 
         speak(f"You have {len(messages)} unread emails matching your criteria.")
         for i, message in enumerate(messages):
-            msg = service.users().messages().get(userId='me', id=message['id'], format='full').execute()
-            headers = msg['payload']['headers']
-            
-            sender = "Unknown Sender"
-            subject = "No Subject"
-            
-            for header in headers:
-                if header['name'] == 'From':
-                    sender = header['value']
-                elif header['name'] == 'Subject':
-                    subject = header['value']
-            
-            msg_body = ""
-            if 'parts' in msg['payload']:
-                for part in msg['payload']['parts']:
-                    if part['mimeType'] == 'text/plain' and 'data' in part['body']:
-                        msg_body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                        break
-                    elif part['mimeType'] == 'text/html' and 'data' in part['body']:
-                        html_body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                        soup = BeautifulSoup(html_body, 'html.parser')
-                        msg_body = soup.get_text()
-                        break
-            elif 'data' in msg['payload']['body']:
-                msg_body = base64.urlsafe_b64decode(msg['payload']['body']['data']).decode('utf-8')
-
-            # Clean up body for speaking
-            msg_body_snippet = msg_body.strip().split('\n')[0] # Take first line
-            if len(msg_body_snippet) > 100: # Limit snippet length
-                msg_body_snippet = msg_body_snippet[:100] + "..."
+            sender = message['sender']
+            subject = message['subject']
+
+            full_msg = (unread_prefetcher.body(message['id'])
+                        or service.users().messages().get(userId='me', id=message['id'], format='full').execute())
+            # First line of the body, cut to 100 characters; decoding stops once it is found.
+            msg_body_snippet = extract_snippet(full_msg)
             
             speak(f"Email {i+1} from {sender}. Subject: {subject}. Message snippet: {msg_body_snippet}")
             
@@ -235,54 +242,107 @@ def read_unread_emails(sender_filter: str = None, email_filter: str = None):
             speak("Would you like me to mark this email as read?")
             confirmation = get_audio("Say yes to mark as read or no to keep unread.")
             if confirmation and "yes" in confirmation:
-                service.users().messages().modify(userId='me', id=message['id'], body={'removeLabelIds': ['UNREAD']}).execute()
-                speak("Email marked as read.")
+                to_mark.append(message['id'])
+                speak("I'll mark it as read when we're done.")
             else:
                 speak("Email kept unread.")
 
     except Exception as e:
         speak("I encountered an error while trying to read your emails.")
         print(f"Error reading emails: {e}")
+    finally:
+        if to_mark:
+            try:
+                _remove_labels(service, to_mark, ['UNREAD'])
+                speak("Email marked as read." if len(to_mark) == 1 else f"{len(to_mark)} emails marked as read.")
+            except Exception as e:
+                speak("I couldn't mark those emails as read.")
+                print(f"Error marking emails as read: {e}")
+        prefetch_unread(force=True)
+
+def _remove_labels(service, message_ids, labels):
+    """Remove labels from many messages in batchModify calls and apply the change to the local caches."""
+    batch_modify(service, message_ids, remove_labels=labels)
+    for label in labels:
+        mail_index.remove_label_from(message_ids, label)
+    if 'UNREAD' in labels:
+        unread_prefetcher.forget(message_ids)
+
+def _confirm_bulk_action(service, query, action, labels):
+    """Resolve every message matching the query, confirm by voice, then remove the labels from all of them."""
+    try:
+        message_ids = list_message_ids(service, query)
+        if not message_ids:
+            speak("There are no matching emails.")
+            return 0
+        speak(f"I found {len(message_ids)} emails. Should I {action} all of them?")
+        confirmation = get_audio("Say yes to continue or no to cancel.")
+        if not (confirmation and "yes" in confirmation):
+            speak("Okay, I left them alone.")
+            return 0
+        _remove_labels(service, message_ids, labels)
+        speak(f"Done. {len(message_ids)} emails updated.")
+        print(f"Bulk action '{action}' applied to {len(message_ids)} emails.")
+        return len(message_ids)
+    except Exception as e:
+        speak("I encountered an error while updating your emails.")
+        print(f"Error in bulk email action: {e}")
+        return 0
+    finally:
+        prefetch_unread(force=True)
+
+def mark_all_as_read(sender_filter: str = None, email_filter: str = None):
+    """Mark every unread email, or every one from a sender, as read."""
+    service = gmail_authenticate()
+    sender = sender_filter or email_filter
+    query = f'is:unread from:{sender}' if sender else 'is:unread'
+    return _confirm_bulk_action(service, query, "mark as read", ['UNREAD'])
 
-def count_unread_emails_by_sender():
+def archive_newsletters():
+    """Archive promotional and newsletter mail from the inbox."""
+    service = gmail_authenticate()
+    return _confirm_bulk_action(service, NEWSLETTER_QUERY, "archive", ['INBOX'])
+
+def count_unread_emails_by_sender(cap: int = COUNT_CAP, top: int = TOP_SENDERS):
     """
     Counts unread emails and provides a breakdown by sender via voice.
-    This function is separate from read_unread_emails to maintain existing functionality.
+    The total comes from the UNREAD label's counter; the breakdown covers at most the newest cap messages
+    and reads out the top senders, summarising the rest.
     """
     service = gmail_authenticate()
     query = 'is:unread'
 
     try:
-        results = service.users().messages().list(userId='me', q=query, maxResults=500).execute() # Increased maxResults for counting
-        messages = results.get('messages', [])
-
-        if not messages:
+        total = unread_prefetcher.unread_total()
+        if total is None:
+            total = _unread_total(service)
+        if not total:
             speak("You have no unread emails.")
             return
+        speak(f"You have a total of {total} unread emails.")
+
+        unread_counts = unread_prefetcher.unread_counts()
+        if mail_index.is_ready():
+            unread_counts = Counter(dict(mail_index.unread_counts_by_sender()))
+            counted = sum(unread_counts.values())
+        elif unread_counts is not None:
+            # Every unread message fitted in the prefetched list.
+            counted = sum(unread_counts.values())
+        else:
+            # Paged and batched, From header only; each page is counted and dropped.
+            unread_counts, counted = count_by_sender(service, query, limit=cap)
 
-        unread_counts = {}
-        for message in messages:
-            msg = service.users().messages().get(userId='me', id=message['id'], format='full').execute()
-            headers = msg['payload']['headers']
-            
-            sender = "Unknown Sender"
-            for header in headers:
-                if header['name'] == 'From':
-                    sender = header['value']
-                    # Extract just the email address or name if available
-                    match = re.search(r'<(.*?)>', sender)
-                    if match:
-                        sender = match.group(1)
-                    else:
-                        sender = sender.split('<')[0].strip() # Take name part if no email in <>
-                    break
-            
-            unread_counts[sender] = unread_counts.get(sender, 0) + 1
-
-        speak(f"You have a total of {len(messages)} unread emails.")
-        speak("Here is the breakdown by sender:")
-        for sender, count in unread_counts.items():
+        ranked = unread_counts.most_common()
+        if counted < total:
+            speak(f"Here is the breakdown for the latest {counted}:")
+        else:
+            speak("Here is the breakdown by sender:")
+        for sender, count in ranked[:top]:
             speak(f"You have {count} unread emails from {sender}.")
+        others = ranked[top:]
+        if others:
+            speak(f"And {sum(count for _, count in others)} more from {len(others)} other senders.")
+        for sender, count in ranked:
             print(f"Unread emails from {sender}: {count}")
 
     except Exception as e:
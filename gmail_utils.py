@@ -0,0 +1,105 @@
+import re
+from collections import Counter
+
+
+# Gmail accepts up to 100 calls per batch but recommends 50 or fewer to avoid rate limiting.
+BATCH_SIZE = 50
+BATCH_MODIFY_SIZE = 1000  # most ids users().messages().batchModify accepts per call
+LIST_PAGE_SIZE = 500
+
+
+def batch_get_messages(service, message_ids, format='metadata', metadata_headers=('From', 'Subject')):
+    """
+    Fetch many messages with Gmail batch requests instead of one round trip each.
+    Returns {message_id: message} for the messages that were fetched successfully.
+    """
+    messages = {}
+
+    def callback(request_id, response, exception):
+        if exception is not None:
+            print(f"Error fetching message {request_id}: {exception}")
+            return
+        messages[request_id] = response
+
+    for start in range(0, len(message_ids), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=callback)
+        for message_id in message_ids[start:start + BATCH_SIZE]:
+            kwargs = {'userId': 'me', 'id': message_id, 'format': format}
+            if format == 'metadata':
+                kwargs['metadataHeaders'] = list(metadata_headers)
+            batch.add(service.users().messages().get(**kwargs), request_id=message_id)
+        batch.execute()
+    return messages
+
+
+def iter_message_id_pages(service, query, limit=None):
+    """Yield lists of ids matching a search query one page at a time, following nextPageToken up to limit."""
+    seen = 0
+    page_token = None
+    while limit is None or seen < limit:
+        page_size = LIST_PAGE_SIZE if limit is None else min(LIST_PAGE_SIZE, limit - seen)
+        response = service.users().messages().list(
+            userId='me', q=query, maxResults=page_size, pageToken=page_token
+        ).execute()
+        page = [message['id'] for message in response.get('messages', [])]
+        if page:
+            seen += len(page)
+            yield page
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            break
+
+
+def list_message_ids(service, query, limit=None):
+    """Ids of all messages matching a search query, following nextPageToken up to limit."""
+    return [message_id for page in iter_message_id_pages(service, query, limit) for message_id in page]
+
+
+def label_counts(service, label_id):
+    """Gmail's own counters for a label: messagesTotal, messagesUnread, threadsTotal, threadsUnread."""
+    return service.users().labels().get(userId='me', id=label_id).execute()
+
+
+def count_by_sender(service, query, limit=None):
+    """
+    Count messages matching a query per sender address, a page at a time.
+    Only the From header is fetched, in batches, and each page is discarded once counted.
+    Returns (Counter of sender -> count, number of messages counted).
+    """
+    counts = Counter()
+    counted = 0
+    for page in iter_message_id_pages(service, query, limit):
+        metadata = batch_get_messages(service, page, metadata_headers=('From',))
+        for message_id in page:
+            sender = get_header(metadata.get(message_id, {}), 'From')
+            counts[sender_key(sender) if sender else "Unknown Sender"] += 1
+        counted += len(page)
+    return counts, counted
+
+
+def batch_modify(service, message_ids, add_labels=(), remove_labels=()):
+    """Add and remove labels on many messages with batchModify, BATCH_MODIFY_SIZE ids per call."""
+    body = {}
+    if add_labels:
+        body['addLabelIds'] = list(add_labels)
+    if remove_labels:
+        body['removeLabelIds'] = list(remove_labels)
+    for start in range(0, len(message_ids), BATCH_MODIFY_SIZE):
+        chunk = list(message_ids[start:start + BATCH_MODIFY_SIZE])
+        service.users().messages().batchModify(userId='me', body={'ids': chunk, **body}).execute()
+
+
+def get_header(msg, name, default=None):
+    """Return the value of a message header, or default if it is missing."""
+    for header in msg.get('payload', {}).get('headers', []):
+        if header['name'].lower() == name.lower():
+            return header['value']
+    return default
+
+
+def sender_key(from_value):
+    """Reduce a From header to the email address, or the display name if there is no address."""
+    match = re.search(r'<(.*?)>', from_value)
+    if match:
+        return match.group(1)
+    return from_value.split('<')[0].strip() # Take name part if no email in <>
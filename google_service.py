@@ -0,0 +1,111 @@
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta, timezone
+
+from google.auth.transport.requests import Request
+from google_auth_oauthlib.flow import InstalledAppFlow
+from googleapiclient.discovery import build
+
+
+REFRESH_MARGIN = timedelta(minutes=5)  # refresh this long before the access token expires
+
+
+class GoogleServiceProvider:
+    """
+    Process-wide provider for an authenticated Google API client.
+    The pickled token is loaded once and refreshed shortly before it expires instead of on every call.
+    Each thread gets its own service object, built once from the bundled static discovery document,
+    because the underlying httplib2 connection is not thread-safe.
+    """
+
+    def __init__(self, api: str, version: str, scopes: list, token_path: str, credentials_path: str):
+        self.api = api
+        self.version = version
+        self.scopes = scopes
+        self.token_path = token_path
+        self.credentials_path = credentials_path
+        self._creds = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _needs_refresh(self) -> bool:
+        creds = self._creds
+        if not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        # google-auth stores expiry as a naive UTC datetime.
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - now < REFRESH_MARGIN
+
+    def _save(self):
+        with open(self.token_path, 'wb') as token:
+            pickle.dump(self._creds, token)
+
+    def credentials(self):
+        """Return valid credentials, loading, refreshing or authorizing them as needed."""
+        with self._lock:
+            if self._creds is None and os.path.exists(self.token_path):
+                with open(self.token_path, 'rb') as token:
+                    self._creds = pickle.load(token)
+
+            if self._creds is not None and not self._needs_refresh():
+                return self._creds
+
+            if self._creds and self._creds.refresh_token:
+                self._creds.refresh(Request())
+            else:
+                flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.scopes)
+                self._creds = flow.run_local_server(port=0)
+            self._save()
+            return self._creds
+
+    def service(self):
+        """Return this thread's service object, building it on first use."""
+        creds = self.credentials()
+        service = getattr(self._local, 'service', None)
+        if service is None or getattr(self._local, 'creds', None) is not creds:
+            service = build(self.api, self.version, credentials=creds, static_discovery=True, cache_discovery=False)
+            self._local.service = service
+            self._local.creds = creds
+        return service
+
+
+class PeriodicSync:
+    """
+    Calls sync(service) on a daemon thread every interval seconds until stopped, for local stores kept current
+    from a Google API. Service objects must not be shared between threads, so background work never reuses
+    the caller's service: service_factory (usually a GoogleServiceProvider's service) is called on the worker
+    thread, and called again after a failed sync in case the connection broke.
+    """
+
+    def __init__(self, sync, name: str):
+        self.sync = sync
+        self.name = name
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, service_factory, interval: float) -> threading.Thread:
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop_event.clear()
+
+        def run():
+            service = None
+            while True:
+                try:
+                    service = service or service_factory()
+                    self.sync(service)
+                except Exception as e:
+                    print(f"{self.name} sync failed: {e}")
+                    service = None
+                if self._stop_event.wait(interval):
+                    break
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,116 @@
+import copy
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def normalize_command(command: str) -> str:
+    """Lower-case a command, drop punctuation and collapse whitespace so trivial variations share a key."""
+    command = re.sub(r"[^\w@.\s-]", " ", command.lower())
+    command = re.sub(r"[.\s]+$", "", command)
+    return " ".join(command.split())
+
+
+class IntentCache:
+    """
+    LRU + TTL cache of analyzed commands, keyed on the normalized command and a prompt/model version.
+    Entries are optionally persisted to a JSON file so they survive restarts.
+    """
+
+    def __init__(self, version: str, path: str = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.version = version
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _key(self, command: str) -> str:
+        return f"{self.version}:{normalize_command(command)}"
+
+    def get(self, command: str) -> dict | None:
+        """Return a copy of the cached result for a command, or None on a miss or expired entry."""
+        key = self._key(command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry["stored_at"] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry["latency"]
+            return copy.deepcopy(entry["result"])
+
+    def put(self, command: str, result: dict, latency: float = 0.0):
+        """Store a result along with the LLM latency it took to produce, evicting the least recently used entry."""
+        key = self._key(command)
+        with self._lock:
+            self._entries[key] = {
+                "result": copy.deepcopy(result),
+                "stored_at": time.time(),
+                "latency": latency,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and the LLM time saved by hits, in seconds."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "saved_seconds": round(self.saved_seconds, 3),
+            }
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not load intent cache from {self.path}: {e}")
+            return
+
+        now = time.time()
+        prefix = f"{self.version}:"
+        for key, entry in data.get("entries", []):
+            if key.startswith(prefix) and now - entry.get("stored_at", 0) <= self.ttl_seconds:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"entries": list(self._entries.items())}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save intent cache to {self.path}: {e}")
@@ -0,0 +1,237 @@
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+
+DEFAULT_DIM = 2 ** 12
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_TOP_K = 3
+REFIT_EVERY = 32  # added examples between IDF refits; in between they are embedded with the current weights
+MAX_STORED_EXAMPLES = 5000  # learned examples kept in the examples file, newest first
+# Words that do not change what a command asks for; any other word not in the matched examples may be an entity.
+FILLER_WORDS = {
+    "a", "an", "the", "my", "me", "i", "do", "does", "have", "has", "please", "can", "could", "would", "you",
+    "to", "of", "for", "is", "are", "all", "any", "some", "now", "just", "hey", "ok", "okay", "what", "tell",
+}
+
+
+def normalize_command(text: str) -> str:
+    """Lower-case words of a command, used to compare and deduplicate examples."""
+    return " ".join(re.findall(r"[\w@.]+", text.lower()))
+
+
+def _content_words(text: str) -> set:
+    words = set()
+    for word in normalize_command(text).split():
+        if word in FILLER_WORDS:
+            continue
+        words.add(word[:-1] if len(word) > 3 and word.endswith("s") else word)
+    return words
+
+
+class HashedTfidfEmbedder:
+    """
+    TF-IDF over hashed character n-grams and words. Needs no model download and no vocabulary file.
+    Any object with the same fit(texts) / transform(texts) interface can be plugged into IntentClassifier.
+    """
+
+    def __init__(self, dim: int = DEFAULT_DIM, ngram_range: tuple = (2, 4)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def _features(self, text: str) -> list:
+        text = normalize_command(text)
+        padded = f" {text} "
+        features = [f"w:{word}" for word in text.split()]
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        # crc32 rather than hash() so vectors are stable across processes.
+        return [zlib.crc32(feature.encode("utf-8")) % self.dim for feature in features]
+
+    def term_frequencies(self, texts: list) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            np.add.at(matrix[row], self._features(text), 1.0)
+        return matrix
+
+    def fit(self, texts: list):
+        tf = self.term_frequencies(texts)
+        document_frequency = np.count_nonzero(tf, axis=0)
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def transform(self, texts: list) -> np.ndarray:
+        matrix = self.term_frequencies(texts) * self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class IntentClassifier:
+    """
+    Nearest-neighbour intent classifier over labelled example commands.
+    Returns an intent only when the best match clears the confidence threshold; otherwise the caller
+    should fall back to the LLM. Examples are deduplicated by their normalized command. Added examples are
+    embedded with the current IDF weights and the weights are refitted every REFIT_EVERY additions.
+    """
+
+    def __init__(self, embedder=None, threshold: float = DEFAULT_THRESHOLD, k: int = DEFAULT_TOP_K):
+        self.embedder = embedder or HashedTfidfEmbedder()
+        self.threshold = threshold
+        self.k = k
+        self.examples = []
+        self._matrix = None
+        self._positions = {}  # normalized command -> index in examples
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def fit(self, examples: list):
+        """examples: list of {'command', 'intent', 'entities'} dicts; a later duplicate replaces an earlier one."""
+        with self._lock:
+            self.examples = []
+            self._positions = {}
+            for example in examples:
+                key = normalize_command(example["command"])
+                if key in self._positions:
+                    self.examples[self._positions[key]] = example
+                else:
+                    self._positions[key] = len(self.examples)
+                    self.examples.append(example)
+            self._refit()
+        return self
+
+    def add_example(self, command: str, intent: str, entities: dict = None) -> bool:
+        """Add or relabel an example. Returns False if the same command is already known with this label."""
+        example = {"command": command, "intent": intent, "entities": entities or {}}
+        key = normalize_command(command)
+        with self._lock:
+            position = self._positions.get(key)
+            if position is not None:
+                known = self.examples[position]
+                if known["intent"] == intent and known["entities"] == example["entities"]:
+                    return False
+                self.examples[position] = example
+                return True
+            self._positions[key] = len(self.examples)
+            self.examples.append(example)
+            self._pending += 1
+            if self._matrix is None or self._pending >= REFIT_EVERY:
+                self._refit()
+            else:
+                self._matrix = np.vstack([self._matrix, self.embedder.transform([command])])
+            return True
+
+    def _refit(self):
+        self._pending = 0
+        commands = [example["command"] for example in self.examples]
+        if not commands:
+            self._matrix = None
+            return
+        self.embedder.fit(commands)
+        self._matrix = self.embedder.transform(commands)
+
+    def top_k(self, command: str, k: int = None) -> list:
+        """Return the k most similar examples as (similarity, example) pairs, best first."""
+        k = k or self.k
+        with self._lock:
+            if self._matrix is None:
+                return []
+            query = self.embedder.transform([command])[0]
+            scores = self._matrix @ query
+            k = min(k, len(scores))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            return [(float(scores[i]), self.examples[i]) for i in best]
+
+    def classify(self, command: str) -> dict | None:
+        """
+        Returns {'intent', 'confidence', 'example', 'new_words'} when the neighbours agree above the threshold,
+        else None. Neighbours vote for their intent weighted by similarity. new_words are the content words of
+        the command found in none of the agreeing neighbours, e.g. "amazon" in "how many unread emails from
+        amazon do i have"; they may be entities the classifier cannot extract.
+        """
+        neighbours = self.top_k(command)
+        if not neighbours:
+            return None
+        votes = {}
+        for score, example in neighbours:
+            votes[example["intent"]] = votes.get(example["intent"], 0.0) + max(score, 0.0)
+        intent = max(votes, key=votes.get)
+        total = sum(votes.values())
+        score, example = next((s, e) for s, e in neighbours if e["intent"] == intent)
+        if score < self.threshold or total == 0 or votes[intent] / total < 0.5:
+            return None
+        known = set()
+        for _, neighbour in neighbours:
+            if neighbour["intent"] == intent:
+                # An entity value in an example ("Amazon") does not make the same word known in a command.
+                values = _content_words(" ".join(str(value) for value in neighbour["entities"].values()))
+                known |= _content_words(neighbour["command"]) - values
+        new_words = sorted(_content_words(command) - known)
+        return {"intent": intent, "confidence": score, "example": example, "new_words": new_words}
+
+
+def load_examples(path: str) -> list:
+    """
+    Load labelled commands from a JSON-lines file, one {'command', 'intent', 'entities'} object per line.
+    Repeated commands keep their latest label, in the position of the first occurrence.
+    """
+    examples = []
+    if not path or not os.path.exists(path):
+        return examples
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                example = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if example.get("command") and example.get("intent"):
+                example.setdefault("entities", {})
+                examples.append(example)
+    positions = {}
+    unique = []
+    for example in examples:
+        key = normalize_command(example["command"])
+        if key in positions:
+            unique[positions[key]] = example
+        else:
+            positions[key] = len(unique)
+            unique.append(example)
+    return unique
+
+
+def compact_examples(path: str, limit: int = MAX_STORED_EXAMPLES) -> list:
+    """
+    Load the examples file and rewrite it without duplicates, keeping the newest limit examples.
+    Returns the examples that were kept.
+    """
+    examples = load_examples(path)
+    if not path or not os.path.exists(path):
+        return examples
+    examples = examples[-limit:]
+    with open(path, "r", encoding="utf-8") as f:
+        line_count = sum(1 for line in f if line.strip())
+    if line_count != len(examples):
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for example in examples:
+                f.write(json.dumps(example) + "\n")
+        os.replace(temp_path, path)
+    return examples
+
+
+def append_example(path: str, command: str, intent: str, entities: dict = None):
+    """Append one labelled command to the examples file."""
+    if not path:
+        return
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"command": command, "intent": intent, "entities": entities or {}}) + "\n")
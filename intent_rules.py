@@ -0,0 +1,88 @@
+import re
+
+
+# Words that signal a compound or free-form command; those are left to the LLM.
+_AMBIGUOUS_APP_WORDS = re.compile(r"\b(?:and|then|type|typing|write|search|in|into|to|with|for|about)\b")
+# Pronouns and determiners refer to something else rather than naming an app: "close it", "open my email".
+_NOT_APP_WORDS = re.compile(
+    r"\b(?:it|this|that|these|those|them|everything|all|every|each|any|some|my|your|his|her|our|their)\b")
+_FILLER = r"(?:please\s+|can you\s+|could you\s+|hey\s+)?"
+_TRAILING = r"(?:\s+(?:please|now|for me))?"
+_APP_NAME = r"(?P<app_name>[\w.+\-]+(?:\s+[\w.+\-]+){0,3}?)"
+_SENDER = r"(?P<sender>[\w@.\-]+(?:\s+[\w.\-]+){0,2}?)"
+
+
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(rf"^{_FILLER}{pattern}{_TRAILING}$", re.IGNORECASE)
+
+
+def _app_entities(match: re.Match) -> dict | None:
+    app_name = match.group("app_name").strip()
+    if not app_name or _AMBIGUOUS_APP_WORDS.search(app_name.lower()) or _NOT_APP_WORDS.search(app_name.lower()):
+        return None
+    return {"app_name": app_name}
+
+
+def _sender_entities(match: re.Match) -> dict | None:
+    sender = match.groupdict().get("sender")
+    if not sender:
+        return {}
+    sender = sender.strip().rstrip(".")
+    if "@" in sender:
+        return {"sender_email": sender}
+    return {"sender_name": sender}
+
+
+def _no_entities(match: re.Match) -> dict:
+    return {}
+
+
+# (intent, pattern, entity extractor). Order matters: the first rule whose pattern matches and whose
+# extractor accepts the match wins, so more specific rules come first.
+RULES = [
+    ("exit_assistant", _compile(
+        r"(?:(?:exit|quit|goodbye|good bye|bye|stop listening|shut ?down)(?:\s+(?:the\s+)?assistant)?"
+        r"|(?:close|stop|turn off)\s+(?:the\s+)?assistant)"), _no_entities),
+    ("read_notifications", _compile(
+        r"(?:read|check|show|tell me|what are)(?:\s+me)?(?:\s+(?:my|the|all))?(?:\s+(?:new|latest|recent))?"
+        r"\s+notifications"), _no_entities),
+    ("list_reminders", _compile(
+        r"(?:(?:list|show|read|tell me|check|what are)(?:\s+me)?(?:\s+(?:all))?(?:\s+(?:my|the))?"
+        r"(?:\s+(?:upcoming|pending))?\s+reminders|do i have any(?:\s+upcoming)? reminders)"), _no_entities),
+    ("mark_emails_read", _compile(
+        r"mark\s+(?:all|every|everything)(?:\s+(?:my|the))?(?:\s+(?:unread|new))?(?:\s+(?:e-?mails?|mails?|messages))?"
+        r"(?:\s+from\s+" + _SENDER + r")?\s+as\s+read"), _sender_entities),
+    ("archive_newsletters", _compile(
+        r"archive(?:\s+(?:all|every))?(?:\s+(?:of\s+)?(?:my|the))?\s+newsletters?"), _no_entities),
+    ("read_unread_emails", _compile(
+        r"(?:count|how many)(?:\s+of)?(?:\s+(?:my|the))?(?:\s+(?:unread|new))?\s+(?:e-?mails?|mails?)"
+        r"(?:\s+(?:do i have|are there|have i got))?\??"), _no_entities),
+    ("read_unread_emails", _compile(
+        r"(?:read|check|show)(?:\s+me)?(?:\s+(?:my|the|all))?(?:\s+(?:new|unread|latest))*"
+        r"\s+(?:e-?mails?|mails?|messages)(?:\s+from\s+" + _SENDER + r")?"), _sender_entities),
+    ("close_application", _compile(
+        r"(?:close|quit|exit|kill|terminate)\s+(?:the\s+)?" + _APP_NAME + r"(?:\s+(?:app|application|window))?"),
+        _app_entities),
+    ("open_application", _compile(
+        r"(?:open|launch)\s+(?:the\s+)?" + _APP_NAME + r"(?:\s+(?:app|application))?"),
+        _app_entities),
+]
+
+
+def match_intent(command: str) -> dict | None:
+    """
+    Matches a command against the precompiled rules.
+    Returns {'intent': ..., 'entities': ...} for unambiguous commands, or None to defer to the LLM.
+    """
+    text = " ".join(command.strip().rstrip(".!").split())
+    if not text:
+        return None
+    for intent, pattern, extract in RULES:
+        match = pattern.match(text)
+        if not match:
+            continue
+        entities = extract(match)
+        if entities is None:
+            continue
+        return {"intent": intent, "entities": entities}
+    return None
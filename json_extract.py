@@ -0,0 +1,120 @@
+import json
+
+
+class JsonObjectExtractor:
+    """
+    Incrementally scans streamed text for the first top-level JSON object.
+    Text before the opening brace (code fences, prose) and anything after the closing brace is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.start = None
+        self.end = None
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self.end is not None
+
+    def feed(self, chunk: str) -> str | None:
+        """Add streamed text; returns the complete object text once the top-level object closes."""
+        if self.done:
+            return self.result()
+        offset = len(self.text)
+        self.text += chunk
+        for i in range(offset, len(self.text)):
+            ch = self.text[i]
+            if self.start is None:
+                if ch == "{":
+                    self.start = i
+                    self._stack.append("}")
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._stack.append("}" if ch == "{" else "]")
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self.end = i + 1
+                    return self.result()
+        return None
+
+    def result(self) -> str:
+        """The complete object if it closed, otherwise whatever was collected from the opening brace on."""
+        if self.start is None:
+            return self.text
+        return self.text[self.start:self.end]
+
+
+def complete_partial_json(text: str):
+    """
+    Try to turn a truncated JSON object into a valid one. A member cut off mid-value is dropped rather than
+    completed, so "recipient": "Al never becomes the value "Al": when the text stops inside a string, number
+    or literal, only cutting back to the last complete member and closing from there is tried. Returns None
+    if nothing parses.
+    """
+    stack = []
+    in_string = False
+    escape = False
+    last_comma = None
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            last_comma = (i, list(stack))
+
+    candidates = []
+    tail = text.rstrip()[-1:]
+    if not in_string and tail in ('"', "}", "]"):
+        # The last value is complete; only the closing brackets are missing.
+        candidates.append(text + "".join(reversed(stack)))
+    if last_comma is not None:
+        cut, cut_stack = last_comma
+        candidates.append(text[:cut] + "".join(reversed(cut_stack)))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def loads_lenient(text: str) -> tuple:
+    """
+    json.loads that tolerates leading/trailing prose and truncated objects.
+    Returns (value, repaired); repaired is True when the object was truncated and had to be completed,
+    so it may be missing members. value is None if nothing parses.
+    """
+    extractor = JsonObjectExtractor()
+    extractor.feed(text)
+    candidate = extractor.result()
+    try:
+        return json.loads(candidate), False
+    except json.JSONDecodeError:
+        value = complete_partial_json(candidate)
+        return value, value is not None
@@ -0,0 +1,189 @@
+import base64
+import binascii
+import codecs
+from email.message import Message
+from html.parser import HTMLParser
+
+
+SNIPPET_LENGTH = 100
+DECODE_CHUNK = 8192  # base64 characters decoded at a time; a multiple of 4
+SKIPPED_TAGS = {'script', 'style', 'head', 'title', 'noscript', 'template'}
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'footer', 'form', 'h1', 'h2',
+    'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'td',
+    'th', 'tr', 'ul',
+}
+
+
+class TextCollector:
+    """
+    Accumulates body text and reports when enough has been seen.
+    With first_line set it is done as soon as the first non-blank line is complete or limit characters long;
+    otherwise it is done after limit characters (or never, if limit is None).
+    """
+
+    def __init__(self, limit: int = None, first_line: bool = False):
+        self.limit = limit
+        self.first_line = first_line
+        self.parts = []
+        self.length = 0
+        self.done = False
+
+    def add(self, text: str):
+        if self.done or not text:
+            return
+        self.parts.append(text)
+        self.length += len(text)
+        if self.first_line:
+            stripped = self.text().lstrip()
+            if '\n' in stripped or (self.limit is not None and len(stripped) > self.limit):
+                self.done = True
+        elif self.limit is not None and self.length >= self.limit:
+            self.done = True
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Streaming tag stripper: feed HTML in pieces, text goes to a TextCollector. Scripts and styles are dropped."""
+
+    def __init__(self, collector: TextCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.collector.add('\n')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            self.collector.add('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.collector.add('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            # Collapse HTML source whitespace; line breaks come from block tags.
+            # Whitespace at either end separates words around inline tags ("Hello <b>world</b> today").
+            text = " ".join(data.split())
+            parts = self.collector.parts
+            after_space = not parts or parts[-1][-1:].isspace()
+            if data[:1].isspace() and not after_space:
+                text = " " + text
+            if text and data[-1:].isspace() and not text.endswith(" "):
+                text += " "
+            self.collector.add(text)
+
+
+def _header(part: dict, name: str) -> str:
+    for header in part.get('headers', []):
+        if header['name'].lower() == name.lower():
+            return header['value']
+    return ""
+
+
+def _charset(part: dict) -> str:
+    """The part's declared charset, or utf-8 when it is missing or unknown to Python."""
+    content_type = _header(part, 'Content-Type')
+    charset = 'utf-8'
+    if content_type:
+        message = Message()
+        message['Content-Type'] = content_type
+        charset = message.get_content_charset() or charset
+    try:
+        codecs.lookup(charset)
+    except LookupError:
+        charset = 'utf-8'
+    return charset
+
+
+def _is_attachment(part: dict) -> bool:
+    return bool(part.get('filename')) or _header(part, 'Content-Disposition').lower().startswith('attachment')
+
+
+def iter_text_parts(payload: dict):
+    """
+    Yield the text/plain or text/html parts of a 'full' format payload in reading order, walking nested
+    multiparts. From a multipart/alternative only the plain-text version is used when there is one.
+    """
+    mime_type = payload.get('mimeType', '')
+    parts = payload.get('parts')
+    if parts:
+        if mime_type == 'multipart/alternative':
+            plain = [part for part in parts if part.get('mimeType') == 'text/plain']
+            parts = plain or [part for part in parts if part.get('mimeType') != 'text/plain']
+            # Alternatives are versions of the same content; read the first one that yields a text part.
+            for part in parts:
+                found = list(iter_text_parts(part))
+                if found:
+                    yield from found
+                    return
+            return
+        for part in parts:
+            yield from iter_text_parts(part)
+    elif mime_type in ('text/plain', 'text/html') and not _is_attachment(payload):
+        if payload.get('body', {}).get('data'):
+            yield payload
+    elif not mime_type and payload.get('body', {}).get('data'):
+        yield payload
+
+
+def iter_decoded(part: dict, chunk_size: int = DECODE_CHUNK):
+    """Decode a part's base64url body and charset a chunk at a time, so a caller can stop early."""
+    data = part['body']['data']
+    decoder = codecs.getincrementaldecoder(_charset(part))(errors='replace')
+    for start in range(0, len(data), chunk_size):
+        chunk = data[start:start + chunk_size]
+        if start + chunk_size >= len(data):
+            chunk += '=' * (-len(chunk) % 4)
+        try:
+            raw = base64.urlsafe_b64decode(chunk)
+        except (binascii.Error, ValueError):
+            break
+        yield decoder.decode(raw)
+    yield decoder.decode(b'', final=True)
+
+
+def _collect(msg: dict, collector: TextCollector) -> str:
+    for part in iter_text_parts(msg.get('payload', {})):
+        if collector.length:
+            collector.add('\n')
+        if part.get('mimeType') == 'text/html':
+            extractor = HTMLTextExtractor(collector)
+            for text in iter_decoded(part):
+                extractor.feed(text)
+                if collector.done:
+                    break
+            else:
+                extractor.close()
+        else:
+            for text in iter_decoded(part):
+                collector.add(text)
+                if collector.done:
+                    break
+        if collector.done:
+            break
+    return collector.text()
+
+
+def extract_body(msg: dict, limit: int = None) -> str:
+    """Plain text of a message fetched in 'full' format, with HTML stripped. Stops after about limit characters."""
+    return _collect(msg, TextCollector(limit))
+
+
+def extract_snippet(msg: dict, length: int = SNIPPET_LENGTH) -> str:
+    """The first non-blank line of the body, cut to length characters; decoding stops as soon as it is known."""
+    text = _collect(msg, TextCollector(length, first_line=True))
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    snippet = lines[0] if lines else ""
+    if len(snippet) > length:
+        snippet = snippet[:length] + "..."
+    return snippet
@@ -0,0 +1,208 @@
+import sqlite3
+import threading
+
+from googleapiclient.errors import HttpError
+
+from gmail_utils import batch_get_messages, get_header, sender_key
+from google_service import PeriodicSync
+from sqlite_meta import META_SCHEMA, get_meta, set_meta
+
+
+MAIL_INDEX_PATH = "mail_index.db"
+INITIAL_QUERY = 'is:unread'
+INITIAL_LIMIT = 5000  # most messages to load on the first full sync
+SYNC_INTERVAL = 30  # seconds between background history syncs
+PAGE_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT,
+    sender TEXT,
+    sender_email TEXT,
+    subject TEXT,
+    snippet TEXT,
+    internal_date INTEGER
+);
+CREATE TABLE IF NOT EXISTS message_labels (
+    message_id TEXT NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (message_id, label)
+);
+CREATE INDEX IF NOT EXISTS idx_labels_label ON message_labels (label, message_id);
+CREATE INDEX IF NOT EXISTS idx_messages_date ON messages (internal_date);
+""" + META_SCHEMA
+
+
+class MailIndex:
+    """
+    Local SQLite index of Gmail message metadata: id, thread, sender, subject, labels and snippet.
+    The first sync loads the unread mailbox; after that it is kept current from users().history().list,
+    starting at the last stored historyId.
+    """
+
+    def __init__(self, path: str = MAIL_INDEX_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._syncer = PeriodicSync(self.sync, "Mail index")
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    @property
+    def history_id(self) -> str | None:
+        with self._lock:
+            return get_meta(self._conn, "history_id")
+
+    def is_ready(self) -> bool:
+        """True once a full load has completed, so the index can answer queries on its own."""
+        return self.history_id is not None
+
+    def _upsert(self, msg: dict):
+        sender = get_header(msg, 'From', "Unknown Sender")
+        self._conn.execute(
+            "INSERT OR REPLACE INTO messages (id, thread_id, sender, sender_email, subject, snippet, internal_date) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (msg['id'], msg.get('threadId'), sender, sender_key(sender), get_header(msg, 'Subject', "No Subject"),
+             msg.get('snippet', ""), int(msg.get('internalDate', 0))),
+        )
+        self._set_labels(msg['id'], msg.get('labelIds', []))
+
+    def _set_labels(self, message_id: str, labels: list):
+        self._conn.execute("DELETE FROM message_labels WHERE message_id = ?", (message_id,))
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO message_labels (message_id, label) VALUES (?, ?)",
+            [(message_id, label) for label in labels],
+        )
+
+    def _delete(self, message_id: str):
+        self._conn.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+        self._conn.execute("DELETE FROM message_labels WHERE message_id = ?", (message_id,))
+
+    def _has(self, message_id: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM messages WHERE id = ?", (message_id,)).fetchone() is not None
+
+    def remove_label(self, message_id: str, label: str):
+        """Apply a label change made locally (e.g. mark as read) without waiting for the next sync."""
+        self.remove_label_from([message_id], label)
+
+    def remove_label_from(self, message_ids, label: str):
+        """remove_label for many messages at once, e.g. after a bulk batchModify."""
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM message_labels WHERE message_id = ? AND label = ?",
+                [(message_id, label) for message_id in message_ids],
+            )
+            self._conn.commit()
+
+    def full_sync(self, service, query: str = INITIAL_QUERY, limit: int = INITIAL_LIMIT):
+        """Rebuild the index from a query. The historyId is taken first so changes made during the load are replayed."""
+        history_id = service.users().getProfile(userId='me').execute()['historyId']
+
+        message_ids = []
+        page_token = None
+        while len(message_ids) < limit:
+            response = service.users().messages().list(
+                userId='me', q=query, maxResults=min(PAGE_SIZE, limit - len(message_ids)), pageToken=page_token
+            ).execute()
+            message_ids.extend(message['id'] for message in response.get('messages', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        messages = batch_get_messages(service, message_ids)
+        with self._lock:
+            self._conn.execute("DELETE FROM messages")
+            self._conn.execute("DELETE FROM message_labels")
+            for msg in messages.values():
+                self._upsert(msg)
+            set_meta(self._conn, "history_id", str(history_id))
+            self._conn.commit()
+        print(f"Mail index loaded {len(messages)} messages.")
+
+    def sync(self, service):
+        """Apply changes since the stored historyId, falling back to a full load if it has expired."""
+        start_history_id = self.history_id
+        if start_history_id is None:
+            self.full_sync(service)
+            return
+
+        records = []
+        page_token = None
+        latest_history_id = start_history_id
+        try:
+            while True:
+                response = service.users().history().list(
+                    userId='me', startHistoryId=start_history_id, pageToken=page_token
+                ).execute()
+                records.extend(response.get('history', []))
+                latest_history_id = response.get('historyId', latest_history_id)
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+        except HttpError as e:
+            if e.resp.status == 404:
+                # The stored historyId is too old for Gmail to replay; start over.
+                self.full_sync(service)
+                return
+            raise
+
+        to_fetch = set()
+        with self._lock:
+            for record in records:
+                for added in record.get('messagesAdded', []):
+                    to_fetch.add(added['message']['id'])
+                for deleted in record.get('messagesDeleted', []):
+                    to_fetch.discard(deleted['message']['id'])
+                    self._delete(deleted['message']['id'])
+                for change in record.get('labelsAdded', []) + record.get('labelsRemoved', []):
+                    message = change['message']
+                    if self._has(message['id']):
+                        self._set_labels(message['id'], message.get('labelIds', []))
+                    elif 'UNREAD' in message.get('labelIds', []):
+                        to_fetch.add(message['id'])
+
+        # Messages deleted after being added simply fail to fetch and are skipped.
+        messages = batch_get_messages(service, sorted(to_fetch)) if to_fetch else {}
+        with self._lock:
+            for msg in messages.values():
+                self._upsert(msg)
+            set_meta(self._conn, "history_id", str(latest_history_id))
+            self._conn.commit()
+
+    def start_background_sync(self, service_factory, interval: float = SYNC_INTERVAL) -> threading.Thread:
+        """Keep the index current on a daemon thread; see PeriodicSync."""
+        return self._syncer.start(service_factory, interval)
+
+    def stop_background_sync(self):
+        self._syncer.stop()
+
+    def unread_messages(self, sender_filter: str = None, limit: int = None) -> list:
+        """Unread messages, newest first, optionally filtered by a substring of the sender name or address."""
+        sql = ("SELECT m.* FROM messages m JOIN message_labels l ON l.message_id = m.id AND l.label = 'UNREAD'")
+        params = []
+        if sender_filter:
+            sql += " WHERE m.sender LIKE ? OR m.sender_email LIKE ?"
+            params += [f"%{sender_filter}%", f"%{sender_filter}%"]
+        sql += " ORDER BY m.internal_date DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def unread_total(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM message_labels WHERE label = 'UNREAD'").fetchone()[0]
+
+    def unread_counts_by_sender(self) -> list:
+        """(sender, count) pairs for unread mail, largest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT m.sender_email AS sender, COUNT(*) AS count FROM messages m "
+                "JOIN message_labels l ON l.message_id = m.id AND l.label = 'UNREAD' "
+                "GROUP BY m.sender_email ORDER BY count DESC"
+            )
+            return [(row["sender"], row["count"]) for row in rows]
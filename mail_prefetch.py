@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import Counter
+
+from gmail_utils import batch_get_messages, sender_key
+from google_service import PeriodicSync
+
+
+PREFETCH_INTERVAL = 120  # seconds between background refreshes
+PREFETCH_TTL = 300  # seconds a prefetched list or count is trusted; outlives a refresh or two that fail
+PREFETCH_LIMIT = 50  # newest unread messages kept; sender-filtered reads are answered locally if all fit
+PREFETCH_BODIES = 5  # newest senders whose latest message is fetched in full ahead of time
+
+
+class UnreadPrefetcher:
+    """
+    Cache of the unread list, the unread total and the latest full message of the newest senders, refreshed
+    on a background thread so that reading or counting mail by voice starts without API delay.
+    loader(service, limit) returns the newest unread messages as dicts with at least 'id' and 'sender';
+    counter(service) returns the number of unread messages. Both run on the prefetch thread with a service
+    from service_factory (see google_service.PeriodicSync for why).
+    """
+
+    def __init__(self, service_factory, loader, counter=None, bodies: int = PREFETCH_BODIES,
+                 ttl: float = PREFETCH_TTL, limit: int = PREFETCH_LIMIT):
+        self.service_factory = service_factory
+        self.loader = loader
+        self.counter = counter
+        self.bodies = bodies
+        self.ttl = ttl
+        self.limit = limit
+        self._messages = None
+        self._complete = False  # True if every unread message fitted in the list
+        self._total = None
+        self._fetched_at = 0.0
+        self._bodies = {}  # id -> full message, kept while the message stays unread
+        self._forgotten = set()  # ids marked read while a prefetch was running
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._thread = None
+        self._periodic = PeriodicSync(self.sync, "Unread prefetch")
+
+    def _fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl
+
+    def _wanted_bodies(self, messages: list) -> list:
+        """Ids of the latest message from each of the newest senders: the first one a filtered read speaks."""
+        wanted, senders = [], set()
+        for message in messages:
+            sender = sender_key(message['sender'])
+            if sender in senders:
+                continue
+            senders.add(sender)
+            if message['id'] not in self._bodies:
+                wanted.append(message['id'])
+            if len(senders) == self.bodies:
+                break
+        return wanted
+
+    def sync(self, service):
+        """Reload the cache with the given service; runs on the background thread."""
+        with self._load_lock:
+            with self._lock:
+                self._forgotten = set()
+            messages = self.loader(service, limit=self.limit)
+            total = self.counter(service) if self.counter else None
+            with self._lock:
+                wanted = self._wanted_bodies(messages)
+            full = batch_get_messages(service, wanted, format='full') if wanted else {}
+            with self._lock:
+                self._messages = [message for message in messages if message['id'] not in self._forgotten]
+                self._complete = len(messages) < self.limit
+                self._total = total
+                self._fetched_at = time.time()
+                unread = {message['id'] for message in self._messages}
+                self._bodies = {message_id: msg for message_id, msg in self._bodies.items() if message_id in unread}
+                self._bodies.update((message_id, msg) for message_id, msg in full.items() if message_id in unread)
+
+    def start(self, interval: float = PREFETCH_INTERVAL) -> threading.Thread:
+        """Refresh now and then every interval seconds on a daemon thread."""
+        return self._periodic.start(self.service_factory, interval)
+
+    def stop(self):
+        self._periodic.stop()
+
+    def prefetch(self, force: bool = False):
+        """Refresh the cache once in the background unless it is still fresh or a refresh is already running."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return self._thread
+            if not force and self._messages is not None and self._fresh(self._fetched_at):
+                return None
+
+            def run():
+                try:
+                    self.sync(self.service_factory())
+                except Exception as e:
+                    print(f"Unread prefetch failed: {e}")
+
+            self._thread = threading.Thread(target=run, daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def unread_messages(self, sender_filter: str = None, limit: int = None) -> list | None:
+        """
+        The prefetched unread messages, newest first, optionally filtered by a substring of the sender, or None
+        if there is no fresh list or a filtered read could match messages beyond the ones prefetched.
+        """
+        with self._lock:
+            if self._messages is None or not self._fresh(self._fetched_at):
+                return None
+            if sender_filter and not self._complete:
+                return None
+            messages = self._messages
+            if sender_filter:
+                needle = sender_filter.lower()
+                messages = [message for message in messages
+                            if needle in message['sender'].lower() or needle in message.get('sender_email', "").lower()]
+            return [dict(message) for message in messages[:limit]]
+
+    def unread_total(self) -> int | None:
+        """The prefetched number of unread messages, or None if there is none or it has expired."""
+        with self._lock:
+            if self._total is None or not self._fresh(self._fetched_at):
+                return None
+            return self._total
+
+    def unread_counts(self) -> Counter | None:
+        """Unread messages per sender address from the prefetched list, or None unless it holds all of them."""
+        with self._lock:
+            if self._messages is None or not self._complete or not self._fresh(self._fetched_at):
+                return None
+            return Counter(sender_key(message['sender']) for message in self._messages)
+
+    def body(self, message_id: str) -> dict | None:
+        """The prefetched full message, or None if it was not prefetched."""
+        with self._lock:
+            return self._bodies.get(message_id)
+
+    def forget(self, message_ids):
+        """Drop messages that are no longer unread, e.g. after marking them as read."""
+        message_ids = set(message_ids)
+        with self._lock:
+            self._forgotten |= message_ids
+            if self._messages is not None:
+                kept = [message for message in self._messages if message['id'] not in message_ids]
+                if self._total is not None:
+                    self._total = max(0, self._total - (len(self._messages) - len(kept)))
+                self._messages = kept
+            for message_id in message_ids:
+                self._bodies.pop(message_id, None)
@@ -3,14 +3,25 @@ import pyttsx3
 from Wtsapp import send_whatsapp_message
 from AppControl import open_application, is_known_app, open_website_search, close_application, load_installed_apps, type_into_application
 from notifications import read_notifications
-from reminder import set_reminder, list_reminders, delete_reminder
-from gmail_integration import voice_send_mail, read_unread_emails, count_unread_emails_by_sender # Import the new function
+from reminder import set_reminder, list_reminders, delete_reminder, start_reminder_sync, time_parser
+from gmail_integration import (voice_send_mail, read_unread_emails, count_unread_emails_by_sender, start_mail_index_sync,
+                               start_outbox, start_unread_prefetch, mark_all_as_read, archive_newsletters)
+from announcements import drain as drain_announcements
 import pyautogui
 import time
+import queue
 import re
-from datetime import datetime
+import threading
 
-from ollama_llm import analyze_command_with_ollama, get_ollama_response
+from ollama_llm import (analyze_command_with_ollama, get_ollama_response, stream_ollama_sentences,
+                        start_model_warmup, ModelHeartbeat, reprime_intent_prompt)
+
+STREAM_ANSWERS = True  # speak answers sentence by sentence while Ollama is still generating
+BARGE_IN_WORDS = ("stop", "cancel", "enough", "be quiet")
+# A barge-in is a short utterance that starts with one of the words, matched as whole words.
+BARGE_IN_PATTERN = re.compile(r"^(?:please\s+|okay\s+|ok\s+)?(?:" + "|".join(BARGE_IN_WORDS) + r")\b")
+BARGE_IN_MAX_WORDS = 4
+PREFETCH_UNREAD = True  # keep unread mail warm on a background timer; email actions also refresh it
 
 load_installed_apps()
 recognizer = sr.Recognizer()
@@ -41,41 +52,83 @@ def get_audio(timeout=10, phrase_time_limit=10) -> str:
             speak("Network error.")
             return None
 
-def parse_date_time_from_llm(date_str, time_str):
-    """Parse date and time strings from LLM output into proper format."""
+def is_barge_in(text: str, speaking: str = "") -> bool:
+    """
+    True if a short utterance starts with a barge-in word. Text that is part of the sentence being spoken is
+    the assistant hearing itself and is ignored.
+    """
+    words = re.findall(r"[a-z0-9']+", (text or "").lower())
+    if not words or len(words) > BARGE_IN_MAX_WORDS:
+        return False
+    # Echo only if the same words occur as a run in the sentence: "stop" is not echo of "the bus stopped".
+    spoken = re.findall(r"[a-z0-9']+", (speaking or "").lower())
+    if any(spoken[i:i + len(words)] == words for i in range(len(spoken) - len(words) + 1)):
+        return False
+    return BARGE_IN_PATTERN.match(" ".join(words)) is not None
+
+def start_barge_in_listener(cancel_event: threading.Event, speaking: list = None):
+    """
+    Listen in the background and set cancel_event when the user says a barge-in word.
+    The microphone also picks up the answer being spoken; speaking[0] holds the current sentence so that echo
+    is ignored, but barge-in is only dependable with a headset.
+    """
+    speaking = speaking if speaking is not None else [""]
+
+    def callback(recognizer, audio):
+        try:
+            text = recognizer.recognize_google(audio).lower()
+        except (sr.UnknownValueError, sr.RequestError):
+            return
+        if is_barge_in(text, speaking[0]):
+            print("Barge-in detected, stopping the answer.")
+            cancel_event.set()
+
+    return recognizer.listen_in_background(sr.Microphone(), callback, phrase_time_limit=3)
+
+def speak_streamed_answer(question: str) -> bool:
+    """
+    Stream an answer from Ollama and speak each sentence as soon as it is complete.
+    Generation runs on a worker thread so the next sentence is produced while the current one is spoken.
+    Returns True if anything was spoken or the user interrupted.
+    """
+    cancel_event = threading.Event()
+    sentences = queue.Queue()
+
+    def produce():
+        try:
+            for sentence in stream_ollama_sentences(question, cancel_event=cancel_event):
+                sentences.put(sentence)
+        finally:
+            sentences.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    speaking = [""]
+    stop_listening = start_barge_in_listener(cancel_event, speaking)
+
+    spoken = False
     try:
-        date_str = re.sub(r'(\d+)(st|nd|rd|th)', r'\1', date_str)
-        
-        date_formats = [
-            "%d %B %Y",    # 25 August 2025
-            "%d-%m-%Y",    # 25-08-2025
-            "%d/%m/%Y",    # 25/08/2025
-            "%B %d %Y",    # August 25 2025
-        ]
-        
-        parsed_date = None
-        for fmt in date_formats:
-            try:
-                parsed_date = datetime.strptime(date_str, fmt)
+        while not cancel_event.is_set():
+            sentence = sentences.get()
+            if sentence is None:
                 break
-            except ValueError:
-                continue
-        
-        if not parsed_date:
-            return None, None
-        
-        time_str = time_str.upper().replace("AM", "").replace("PM", "").strip()
-        if ":" in time_str:
-            time_obj = datetime.strptime(time_str, "%H:%M")
-        else:
-            time_obj = datetime.strptime(time_str, "%H")
-        
-        final_datetime = datetime.combine(parsed_date.date(), time_obj.time())
-        return final_datetime.strftime("%d-%m-%Y"), final_datetime.strftime("%H:%M")
-        
-    except Exception as e:
-        print(f"Error parsing date/time: {e}")
+            speaking[0] = sentence
+            speak(sentence)
+            spoken = True
+    finally:
+        interrupted = cancel_event.is_set()
+        cancel_event.set()
+        stop_listening(wait_for_stop=True)
+    return spoken or interrupted
+
+def parse_date_time_from_llm(date_str, time_str):
+    """
+    Parse date and time strings from LLM output ("tomorrow", "5 PM", "25th August") into
+    ("DD-MM-YYYY", "HH:MM") in the reminder timezone, or (None, None).
+    """
+    parsed = time_parser.parse(date_str, time_str)
+    if parsed is None:
         return None, None
+    return parsed.strftime("%d-%m-%Y"), parsed.strftime("%H:%M")
 
 def handle_send_message(entities: dict):
     """Handle the send_message intent using WhatsApp functionality."""
@@ -113,8 +166,26 @@ def handle_open_and_type(entities: dict):
 
 def listen_loop():
     """Main listening loop."""
+    # Load the model while the greeting is spoken and keep it resident for as long as we run.
+    start_model_warmup()
+    heartbeat = ModelHeartbeat().start()
+    start_mail_index_sync()
+    start_outbox()
+    start_reminder_sync()
+    if PREFETCH_UNREAD:
+        start_unread_prefetch()
+    try:
+        _listen_loop()
+    finally:
+        heartbeat.stop()
+
+def _listen_loop():
     speak("Assistant is ready.")
     while True:
+        # Results from background work (e.g. queued email) are spoken between commands.
+        for announcement in drain_announcements():
+            speak(announcement)
+
         command = get_audio(timeout=5, phrase_time_limit=6)
         if not command:
             continue
@@ -123,7 +194,7 @@ def listen_loop():
         parsed_command = analyze_command_with_ollama(command)
         intent = parsed_command.get("intent")
         entities = parsed_command.get("entities", {})
-        print(f"LLM parsed intent: {intent}, entities: {entities}")
+        print(f"LLM parsed intent: {intent}, entities: {entities}, source: {parsed_command.get('source')}")
 
         if intent == "greeting":
             speak("Yes, how can I assist you?")
@@ -139,6 +210,14 @@ def listen_loop():
                 speak("Counting your unread emails by sender.")
                 count_unread_emails_by_sender()
 
+        elif intent == "mark_emails_read":
+            sender_name = entities.get("sender_name")
+            sender_email = entities.get("sender_email")
+            mark_all_as_read(sender_filter=sender_name, email_filter=sender_email)
+
+        elif intent == "archive_newsletters":
+            archive_newsletters()
+
         elif intent == "send_whatsapp_message" or intent == "send_message":
             handle_send_message(entities)
 
@@ -186,14 +265,15 @@ def listen_loop():
             time_str = entities.get("time")
             note = entities.get("note")
             
-            if date_str and time_str and note:
+            if (date_str or time_str) and note:
+                # A time alone means its next occurrence; either field may hold both, as in "tomorrow at 5 PM".
                 parsed_date, parsed_time = parse_date_time_from_llm(date_str, time_str)
                 if parsed_date and parsed_time:
                     speak(f"Setting reminder for {parsed_date} at {parsed_time} about {note}.")
                     set_reminder(date_str=parsed_date, time_str=parsed_time, note=note)
                 else:
                     speak("I couldn't understand the date or time format. Let's set it interactively.")
-                    set_reminder()
+                    set_reminder(note=note)
             else:
                 speak("Let's set a reminder.")
                 set_reminder()
@@ -237,11 +317,17 @@ def listen_loop():
             question = entities.get("question")
             if question:
                 speak(f"Let me find that for you.")
-                answer = get_ollama_response(question)
-                if answer:
-                    speak(answer)
+                if STREAM_ANSWERS:
+                    if not speak_streamed_answer(question):
+                        speak("I couldn't find an answer to that question.")
                 else:
-                    speak("I couldn't find an answer to that question.")
+                    answer = get_ollama_response(question)
+                    if answer:
+                        speak(answer)
+                    else:
+                        speak("I couldn't find an answer to that question.")
+                # The answer displaced the intent prefix from Ollama's prompt cache; restore it before the next command.
+                reprime_intent_prompt()
             else:
                 speak("What question would you like me to answer?")
 
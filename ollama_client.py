@@ -0,0 +1,233 @@
+import asyncio
+import json
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+OLLAMA_HOST = "http://localhost:11434"
+CONNECT_TIMEOUT = 3.05  # seconds to establish the TCP connection
+READ_TIMEOUT = 120  # seconds to wait for Ollama between bytes of the response
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.5
+POOL_MAXSIZE = 8
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+# Timing fields Ollama reports on the final response, in nanoseconds.
+_DURATION_FIELDS = ("total_duration", "load_duration", "prompt_eval_duration", "eval_duration")
+_COUNT_FIELDS = ("prompt_eval_count", "eval_count")
+# A first streamed chunk slower than this points at a model load, for streams closed before Ollama's timings.
+SLOW_FIRST_CHUNK = 2.0
+
+
+class OllamaMetrics:
+    """
+    Aggregates Ollama's own timing fields so model load time can be told apart from generation time.
+    Ollama only reports them on the final chunk, so streams closed early (e.g. once the intent JSON is
+    complete) are counted by their time to first chunk instead, which covers load and prompt evaluation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.timed_requests = 0
+        self.closed_early = 0
+        self.cold_loads = 0
+        self.slow_first_chunks = 0
+        self.totals = dict.fromkeys(_DURATION_FIELDS + _COUNT_FIELDS, 0)
+        self.first_chunks = 0
+        self.first_chunk_total = 0.0
+        self.last = {}
+
+    def _record_first_chunk(self, seconds: float | None):
+        if seconds is None:
+            return
+        self.first_chunks += 1
+        self.first_chunk_total += seconds
+        if seconds > SLOW_FIRST_CHUNK:
+            self.slow_first_chunks += 1
+
+    def record(self, data: dict, first_chunk: float = None):
+        """Record the timing fields of a final (done) response, if present, and the stream's time to first chunk."""
+        if "total_duration" not in data:
+            return
+        sample = {field: data.get(field, 0) or 0 for field in _DURATION_FIELDS + _COUNT_FIELDS}
+        with self._lock:
+            self.requests += 1
+            self.timed_requests += 1
+            self._record_first_chunk(first_chunk)
+            # Anything over 100 ms of load time means the model had to be (re)loaded into memory.
+            if sample["load_duration"] > 100_000_000:
+                self.cold_loads += 1
+            for field, value in sample.items():
+                self.totals[field] += value
+            self.last = sample
+
+    def record_closed_early(self, first_chunk: float):
+        """Record a stream closed before its final chunk, which carries no Ollama timings."""
+        with self._lock:
+            self.requests += 1
+            self.closed_early += 1
+            self._record_first_chunk(first_chunk)
+
+    def summary(self) -> dict:
+        """
+        Totals and per-request averages in milliseconds, plus the last request's breakdown.
+        Duration averages cover the requests that reported timings; first-chunk figures cover every stream.
+        """
+        with self._lock:
+            n = self.timed_requests or 1
+            summary = {"requests": self.requests, "closed_early": self.closed_early, "cold_loads": self.cold_loads,
+                       "slow_first_chunks": self.slow_first_chunks,
+                       "avg_first_chunk_ms": round(self.first_chunk_total * 1000 / (self.first_chunks or 1), 3)}
+            for field in _DURATION_FIELDS:
+                summary[f"{field}_ms"] = round(self.totals[field] / 1e6, 3)
+                summary[f"avg_{field}_ms"] = round(self.totals[field] / 1e6 / n, 3)
+            for field in _COUNT_FIELDS:
+                summary[field] = self.totals[field]
+            summary["last"] = dict(self.last)
+            return summary
+
+
+class OllamaClient:
+    """
+    Pooled, keep-alive HTTP client for the local Ollama API.
+    One session is shared by every caller so connections are reused between commands.
+    """
+
+    def __init__(self, host: str = OLLAMA_HOST, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 backoff_factor: float = BACKOFF_FACTOR, pool_maxsize: int = POOL_MAXSIZE):
+        self.host = host.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.pool_maxsize = pool_maxsize
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        self.metrics = OllamaMetrics()
+
+    def url(self, path: str) -> str:
+        return f"{self.host}{path}"
+
+    def post(self, path: str, payload: dict, stream: bool = False) -> requests.Response:
+        """
+        POST a JSON payload, retrying connection failures and 5xx responses with exponential backoff.
+        Read timeouts are not retried: a stalled model should fail fast instead of blocking the caller again.
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+            try:
+                response = self.session.post(
+                    self.url(path),
+                    json=payload,
+                    stream=stream,
+                    timeout=(self.connect_timeout, self.read_timeout),
+                )
+            except requests.exceptions.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                response.close()
+                continue
+            response.raise_for_status()
+            return response
+
+    def generate(self, payload: dict) -> dict:
+        """Call /api/generate with a non-streaming payload and return the decoded JSON body."""
+        response = self.post("/api/generate", payload)
+        data = response.json()
+        self.metrics.record(data)
+        return data
+
+    def stream_generate(self, payload: dict, cancel_event: threading.Event = None):
+        """
+        Call /api/generate with streaming enabled and yield each decoded NDJSON chunk.
+        Closing the connection when cancel_event is set makes Ollama stop generating.
+        """
+        started = time.perf_counter()
+        first_chunk = None
+        finished = False
+        response = self.post("/api/generate", dict(payload, stream=True), stream=True)
+        try:
+            for line in response.iter_lines():
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - started
+                if chunk.get("done"):
+                    finished = True
+                    self.metrics.record(chunk, first_chunk=first_chunk)
+                yield chunk
+                if chunk.get("done"):
+                    break
+        finally:
+            if not finished and first_chunk is not None:
+                self.metrics.record_closed_early(first_chunk)
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncOllamaClient:
+    """
+    asyncio front-end for OllamaClient.
+    Requests run on worker threads over the shared pooled session; concurrency is capped at the pool size.
+    """
+
+    def __init__(self, client: OllamaClient = None):
+        self.client = client or get_client()
+        self._semaphore = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.client.pool_maxsize)
+        return self._semaphore
+
+    async def post(self, path: str, payload: dict, stream: bool = False) -> requests.Response:
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self.client.post, path, payload, stream)
+
+    async def generate(self, payload: dict) -> dict:
+        async with self._get_semaphore():
+            return await asyncio.to_thread(self.client.generate, payload)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OllamaClient:
+    """Return the process-wide Ollama client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OllamaClient()
+    return _client
+
+
+def set_client(client: OllamaClient):
+    """Replace the process-wide client, e.g. to point at a different host or timeouts."""
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
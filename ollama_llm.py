@@ -1,22 +1,35 @@
 import requests
 import json
 import re
+import hashlib
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
+from ollama_client import OLLAMA_HOST, get_client
+from intent_cache import IntentCache
+from intent_rules import match_intent
+from json_extract import JsonObjectExtractor, loads_lenient
+from intent_classifier import IntentClassifier, append_example, compact_examples
 
-OLLAMA_API_BASE_URL = "http://localhost:11434/api/generate"
+
+OLLAMA_API_BASE_URL = f"{OLLAMA_HOST}/api/generate"
 OLLAMA_MODEL_NAME = "mistral"  
+INTENT_NUM_PREDICT = 256  # the intent JSON is short; generation is also cut off once the object closes
+OLLAMA_KEEP_ALIVE = "30m"  # how long Ollama keeps the model loaded after each request
+HEARTBEAT_INTERVAL = 300  # seconds between keep-alive pings while the assistant runs
 
 def get_ollama_response(prompt: str) -> str | None:
     """
     Sends a prompt to the local Ollama API and returns the generated text.
+    Goes through the shared pooled client so connections are reused and requests time out.
     """
-    headers = {
-        "Content-Type": "application/json",
-    }
     payload = {
         "model": OLLAMA_MODEL_NAME,
         "prompt": prompt,
         "stream": False,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
         "options": {
             "temperature": 0.0,
             "num_predict": 2000
@@ -24,14 +37,15 @@ def get_ollama_response(prompt: str) -> str | None:
     }
 
     try:
-        response = requests.post(OLLAMA_API_BASE_URL, headers=headers, json=payload)
-        response.raise_for_status()
-        response_data = response.json()
+        response_data = get_client().generate(payload)
         return response_data.get("response")
     except requests.exceptions.ConnectionError:
         print(f"Error: Could not connect to Ollama API at {OLLAMA_API_BASE_URL}.")
         print(f"Please ensure Ollama is running and the model '{OLLAMA_MODEL_NAME}' is downloaded.")
         return None
+    except requests.exceptions.Timeout:
+        print(f"Ollama API request timed out at {OLLAMA_API_BASE_URL}.")
+        return None
     except requests.exceptions.RequestException as e:
         print(f"Ollama API request failed: {e}")
         return None
@@ -42,13 +56,199 @@ def get_ollama_response(prompt: str) -> str | None:
         print("Unexpected Ollama response format.")
         return None
 
-def analyze_command_with_ollama(command: str) -> dict:
+def stream_ollama_response(prompt: str, cancel_event=None):
     """
-    Analyzes a voice command using the local Ollama LLM to extract intent and entities.
-    Returns a dictionary with 'intent' and 'entities'.
+    Streams generated text from the local Ollama API, yielding tokens as they arrive.
+    Generation stops as soon as cancel_event is set.
     """
-    
-    prompt_template = """You are an AI assistant designed to analyze user voice commands and extract their intent and relevant entities.
+    payload = {
+        "model": OLLAMA_MODEL_NAME,
+        "prompt": prompt,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {
+            "temperature": 0.0,
+            "num_predict": 2000
+        }
+    }
+
+    try:
+        for chunk in get_client().stream_generate(payload, cancel_event=cancel_event):
+            token = chunk.get("response")
+            if token:
+                yield token
+    except requests.exceptions.ConnectionError:
+        print(f"Error: Could not connect to Ollama API at {OLLAMA_API_BASE_URL}.")
+        print(f"Please ensure Ollama is running and the model '{OLLAMA_MODEL_NAME}' is downloaded.")
+    except requests.exceptions.Timeout:
+        print(f"Ollama API request timed out at {OLLAMA_API_BASE_URL}.")
+    except requests.exceptions.RequestException as e:
+        print(f"Ollama API request failed: {e}")
+    except json.JSONDecodeError:
+        print("Failed to decode JSON from Ollama stream.")
+
+def get_ollama_json_response(prompt: str, num_predict: int = INTENT_NUM_PREDICT, system: str = None,
+                             timings: dict = None) -> str | None:
+    """
+    Streams a JSON-mode response from Ollama and stops the request as soon as the top-level object closes.
+    Returns the object text, which may be incomplete if the stream ended early, or None on failure.
+    If a timings dict is given, the time to the first streamed token is stored in it as 'first_token_ms'.
+    """
+    payload = {
+        "model": OLLAMA_MODEL_NAME,
+        "prompt": prompt,
+        "format": "json",
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": {
+            "temperature": 0.0,
+            "num_predict": num_predict
+        }
+    }
+
+    if system is not None:
+        payload["system"] = system
+
+    extractor = JsonObjectExtractor()
+    start = time.perf_counter()
+    try:
+        stream = get_client().stream_generate(payload)
+        try:
+            for chunk in stream:
+                if timings is not None and "first_token_ms" not in timings:
+                    timings["first_token_ms"] = (time.perf_counter() - start) * 1000
+                if extractor.feed(chunk.get("response", "")) is not None:
+                    break
+        finally:
+            # Closing the stream drops the connection, which makes Ollama stop generating.
+            stream.close()
+    except requests.exceptions.ConnectionError:
+        print(f"Error: Could not connect to Ollama API at {OLLAMA_API_BASE_URL}.")
+        print(f"Please ensure Ollama is running and the model '{OLLAMA_MODEL_NAME}' is downloaded.")
+        return None
+    except requests.exceptions.Timeout:
+        print(f"Ollama API request timed out at {OLLAMA_API_BASE_URL}.")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Ollama API request failed: {e}")
+        return None
+    except json.JSONDecodeError:
+        print("Failed to decode JSON from Ollama stream.")
+        return None
+    return extractor.result() or None
+
+def warm_up_model() -> bool:
+    """
+    Loads the model into Ollama's memory without generating anything.
+    A generate request with no prompt only loads the model and applies keep_alive.
+    """
+    payload = {"model": OLLAMA_MODEL_NAME, "stream": False, "keep_alive": OLLAMA_KEEP_ALIVE}
+    try:
+        response_data = get_client().generate(payload)
+    except requests.exceptions.RequestException as e:
+        print(f"Could not warm up Ollama model '{OLLAMA_MODEL_NAME}': {e}")
+        return False
+    load_ms = (response_data.get("load_duration") or 0) / 1e6
+    print(f"Ollama model '{OLLAMA_MODEL_NAME}' is loaded (load took {load_ms:.0f} ms).")
+    return True
+
+def _warm_up():
+    if warm_up_model():
+        intent_prompt.prime()
+
+def start_model_warmup() -> threading.Thread:
+    """Load the model and evaluate the intent prompt prefix on a background thread so startup is not blocked."""
+    thread = threading.Thread(target=_warm_up, daemon=True)
+    thread.start()
+    return thread
+
+class ModelHeartbeat:
+    """
+    Background thread that periodically re-sends keep_alive so Ollama does not unload the model.
+    Each beat re-primes the intent prefix, which also keeps it in the prompt cache.
+    """
+
+    def __init__(self, interval: float = HEARTBEAT_INTERVAL):
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            intent_prompt.prime()
+
+def get_ollama_metrics() -> dict:
+    """Load-time vs generation-time breakdown of the Ollama requests made so far."""
+    return get_client().metrics.summary()
+
+# A sentence ends at ., ! or ? followed by whitespace (so "3.5" and "e.g.x" stay intact), or at a line break.
+_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+|\n+')
+
+class SentenceChunker:
+    """Accumulates streamed tokens and releases complete sentences as soon as they end."""
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, token: str) -> list:
+        self.buffer += token
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+            # Very short pieces ("Dr.", "1.") are held back and joined with the next sentence.
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> list:
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return [remainder] if remainder else []
+
+def stream_ollama_sentences(prompt: str, cancel_event=None):
+    """Streams an answer from Ollama and yields it one complete sentence at a time."""
+    chunker = SentenceChunker()
+    for token in stream_ollama_response(prompt, cancel_event=cancel_event):
+        yield from chunker.feed(token)
+    if cancel_event is None or not cancel_event.is_set():
+        yield from chunker.flush()
+
+# Few-shot examples for the intent prompt. They double as the seed dataset for the local intent classifier.
+INTENT_EXAMPLES = [
+    ("Open Notepad", {"intent": "open_application", "entities": {"app_name": "notepad"}}),
+    ("Send a WhatsApp message to John saying hello", {"intent": "send_whatsapp_message", "entities": {"contact": "John", "message": "hello"}}),
+    ("Remind me to buy groceries tomorrow at 5 PM", {"intent": "set_reminder", "entities": {"date": "tomorrow", "time": "5 PM", "note": "buy groceries"}}),
+    ("Send an email to Alice with subject meeting update and body the meeting is rescheduled to Friday", {"intent": "send_email", "entities": {"recipient": "Alice", "subject": "meeting update", "body": "the meeting is rescheduled to Friday"}}),
+    ("Type 'This is a test' into Microsoft Word", {"intent": "type_into_application", "entities": {"text_to_type": "This is a test", "target_app": "Microsoft Word"}}),
+    ("Read my unread emails", {"intent": "read_unread_emails", "entities": {}}),
+    ("Read unread emails from Google", {"intent": "read_unread_emails", "entities": {"sender_name": "Google"}}),
+    ("Check new messages from noreply@google.com", {"intent": "read_unread_emails", "entities": {"sender_email": "noreply@google.com"}}),
+    ("Show me emails from Amazon", {"intent": "read_unread_emails", "entities": {"sender_name": "Amazon"}}),
+    ("Count my unread emails", {"intent": "read_unread_emails", "entities": {}}),
+    ("How many unread emails do I have?", {"intent": "read_unread_emails", "entities": {}}),
+    ("Mark all emails from LinkedIn as read", {"intent": "mark_emails_read", "entities": {"sender_name": "LinkedIn"}}),
+    ("Mark all my emails as read", {"intent": "mark_emails_read", "entities": {}}),
+    ("Archive all newsletters", {"intent": "archive_newsletters", "entities": {}}),
+]
+
+def format_intent_examples(examples: list) -> str:
+    """Render (command, output) pairs in the few-shot format used by the intent prompt."""
+    return "\n".join(f':User  "{command}"\nOutput: {json.dumps(output)}\n' for command, output in examples)
+
+INTENT_SYSTEM_TEMPLATE = """You are an AI assistant designed to analyze user voice commands and extract their intent and relevant entities.
 Your output must be a JSON object with the following structure:
 {{
   "intent": "string",
@@ -77,83 +277,262 @@ COMMAND ANALYSIS RULES:
 3. For WhatsApp messages, the intent MUST be EXACTLY "send_whatsapp_message"
 4. Use "sender_name" for names like "Google" or "John"
 5. Use "sender_email" for email addresses like "noreply@google.com"
+6. For marking many emails as read at once, the intent MUST be EXACTLY "mark_emails_read"
 
 Here are some examples:
 
-:User  "Open Notepad"
-Output: {{"intent": "open_application", "entities": {{"app_name": "notepad"}}}}
+{examples}
+"""
+
+# Only this part changes between calls; everything above is the fixed prefix.
+INTENT_COMMAND_TEMPLATE = """User  command: "{command}"
+Output:
+"""
+
+class IntentPrompt:
+    """
+    The intent prompt split into a fixed system prefix (instructions and few-shot examples) and the command line.
+    The prefix is rendered only when the examples change and sent as Ollama's `system` field, so every call
+    shares the same leading tokens and Ollama can reuse the evaluated prefix from its prompt cache instead of
+    prefilling ~2 KB of text each time. prime() evaluates the prefix ahead of the first real command.
+    """
 
-:User  "Send a WhatsApp message to John saying hello"
-Output: {{"intent": "send_whatsapp_message", "entities": {{"contact": "John", "message": "hello"}}}}
+    def __init__(self, examples: list):
+        self.examples_text = None
+        self._lock = threading.Lock()
+        self.set_examples(examples)
 
-:User  "Remind me to buy groceries tomorrow at 5 PM"
-Output: {{"intent": "set_reminder", "entities": {{"date": "tomorrow", "time": "5 PM", "note": "buy groceries"}}}}
+    def set_examples(self, examples: list) -> bool:
+        """Re-render the prefix if the examples changed. Returns True if it was rebuilt."""
+        examples_text = format_intent_examples(examples)
+        if examples_text == self.examples_text:
+            return False
+        with self._lock:
+            self.examples = list(examples)
+            self.examples_text = examples_text
+            self.system = INTENT_SYSTEM_TEMPLATE.format(examples=examples_text)
+            # Cached results are only valid for the prompt and model that produced them.
+            self.version = hashlib.sha1(
+                f"{OLLAMA_MODEL_NAME}\n{self.system}\n{INTENT_COMMAND_TEMPLATE}".encode("utf-8")
+            ).hexdigest()[:12]
+            self.baseline_prompt_eval_ms = 0.0
+            self.baseline_prompt_tokens = 0
+            self.calls = 0
+            self.saved_ms = 0.0
+        return True
 
-:User  "Send an email to Alice with subject meeting update and body the meeting is rescheduled to Friday"
-Output: {{"intent": "send_email", "entities": {{"recipient": "Alice", "subject": "meeting update", "body": "the meeting is rescheduled to Friday"}}}}
+    def command_prompt(self, command: str) -> str:
+        return INTENT_COMMAND_TEMPLATE.format(command=command)
 
-:User  "Type 'This is a test' into Microsoft Word"
-Output: {{"intent": "type_into_application", "entities": {{"text_to_type": "This is a test", "target_app": "Microsoft Word"}}}}
+    def full_prompt(self, command: str) -> str:
+        """The prefix and command as a single prompt, for endpoints without a system field."""
+        return self.system + self.command_prompt(command)
 
-:User  "Read my unread emails"
-Output: {{"intent": "read_unread_emails", "entities": {{}}}}
+    def prime(self) -> bool:
+        """Evaluate the fixed prefix once so it is in Ollama's cache, recording the full prefill cost."""
+        payload = {
+            "model": OLLAMA_MODEL_NAME,
+            "system": self.system,
+            "prompt": self.command_prompt("hello"),
+            "stream": False,
+            "format": "json",
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {
+                "temperature": 0.0,
+                "num_predict": 1
+            }
+        }
+        try:
+            response_data = get_client().generate(payload)
+        except requests.exceptions.RequestException as e:
+            print(f"Could not prime the intent prompt: {e}")
+            return False
+        prompt_eval_ms = (response_data.get("prompt_eval_duration") or 0) / 1e6
+        prompt_tokens = response_data.get("prompt_eval_count") or 0
+        with self._lock:
+            # A re-prime that hits the cache evaluates only a few tokens; keep the cold measurement.
+            if prompt_tokens >= self.baseline_prompt_tokens:
+                self.baseline_prompt_eval_ms = prompt_eval_ms
+                self.baseline_prompt_tokens = prompt_tokens
+        return True
 
-:User  "Read unread emails from Google"
-Output: {{"intent": "read_unread_emails", "entities": {{"sender_name": "Google"}}}}
+    def record_call(self, first_token_ms: float):
+        """Credit a call with the prefill time it avoided: the cold prefix cost minus its time to first token."""
+        with self._lock:
+            self.calls += 1
+            if self.baseline_prompt_eval_ms:
+                self.saved_ms += max(0.0, self.baseline_prompt_eval_ms - first_token_ms)
 
-:User  "Check new messages from noreply@google.com"
-Output: {{"intent": "read_unread_emails", "entities": {{"sender_email": "noreply@google.com"}}}}
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self.version,
+                "prefix_tokens": self.baseline_prompt_tokens,
+                "prefix_prompt_eval_ms": round(self.baseline_prompt_eval_ms, 3),
+                "calls": self.calls,
+                "saved_ms_total": round(self.saved_ms, 3),
+                "saved_ms_per_call": round(self.saved_ms / self.calls, 3) if self.calls else 0.0,
+            }
 
-:User  "Show me emails from Amazon"
-Output: {{"intent": "read_unread_emails", "entities": {{"sender_name": "Amazon"}}}}
+intent_prompt = IntentPrompt(INTENT_EXAMPLES)
+PROMPT_VERSION = intent_prompt.version
+INTENT_CACHE_PATH = "intent_cache.json"  # set to None to keep the cache in memory only
+INTENT_EXAMPLES_PATH = "intent_examples.jsonl"  # commands labelled by the LLM, appended as they are seen and compacted at start
 
-:User  "Count my unread emails"
-Output: {{"intent": "read_unread_emails", "entities": {{}}}}
+intent_cache = IntentCache(version=PROMPT_VERSION, path=INTENT_CACHE_PATH)
+intent_classifier = IntentClassifier().fit(
+    [{"command": command, **output} for command, output in INTENT_EXAMPLES] + compact_examples(INTENT_EXAMPLES_PATH)
+)
 
-:User  "How many unread emails do I have?"
-Output: {{"intent": "read_unread_emails", "entities": {{}}}}
+# How many commands each path answered: "rules", "cache", "classifier", "llm", "llm_repaired" or "fallback".
+intent_path_stats = Counter()
+_intent_path_lock = threading.Lock()
 
-User  command: "{command}"
-Output:
-"""
-    
-    full_prompt = prompt_template.format(command=command)
-    llm_raw_output = get_ollama_response(full_prompt)
+def _count_path(path: str):
+    with _intent_path_lock:
+        intent_path_stats[path] += 1
+
+def analyze_command_with_ollama(command: str) -> dict:
+    """
+    Analyzes a voice command using the local Ollama LLM to extract intent and entities.
+    Returns a dictionary with 'intent', 'entities' and 'source', the path that answered.
+    Unambiguous commands are answered by the rule engine, repeated ones from the intent cache and
+    close paraphrases of known commands by the nearest-neighbour classifier.
+    """
+    result = match_intent(command)
+    if result is not None:
+        result["source"] = "rules"
+        _count_path("rules")
+        return result
+
+    cached = intent_cache.get(command)
+    if cached is not None:
+        cached["source"] = "cache"
+        _count_path("cache")
+        return cached
+
+    prediction = intent_classifier.classify(command)
+    # Entities are not extracted by the classifier, so only trust it when the matched example has none and the
+    # command adds no words the examples lack ("how many unread emails from amazon" must keep its sender).
+    if prediction is not None and not prediction["example"]["entities"] and not prediction["new_words"]:
+        _count_path("classifier")
+        return {"intent": prediction["intent"], "entities": {}, "source": "classifier"}
+
+    start = time.perf_counter()
+    result = _analyze_command_uncached(command)
+    if result.get("intent") != "unknown" and result["source"] != "llm_repaired":
+        intent_cache.put(command, result, latency=time.perf_counter() - start)
+    if result["source"] == "llm" and result.get("intent") != "unknown":
+        _learn_example(command, result)
+    _count_path(result["source"])
+    return result
+
+def _learn_example(command: str, result: dict):
+    """Record an LLM-labelled command so the classifier can answer it and its paraphrases next time."""
+    entities = {key: value for key, value in result.get("entities", {}).items() if value}
+    if not intent_classifier.add_example(command, result["intent"], entities):
+        return
+    try:
+        append_example(INTENT_EXAMPLES_PATH, command, result["intent"], entities)
+    except OSError as e:
+        print(f"Could not save intent example to {INTENT_EXAMPLES_PATH}: {e}")
+
+def get_intent_path_stats() -> dict:
+    """Share of commands answered by each path, for tuning rule coverage."""
+    with _intent_path_lock:
+        counts = dict(intent_path_stats)
+    total = sum(counts.values())
+    return {path: {"count": count, "share": count / total} for path, count in counts.items()}
+
+def analyze_commands(commands: list, max_workers: int = 4, llm_only: bool = False) -> list:
+    """
+    Analyzes many commands concurrently with at most max_workers requests in flight.
+    Returns one {'command', 'result', 'latency'} dict per command, in input order.
+    With llm_only=True the rule engine, cache and classifier are bypassed, e.g. to regression-test prompt changes.
+    """
+    analyze = _analyze_command_uncached if llm_only else analyze_command_with_ollama
+
+    def timed(command: str) -> dict:
+        start = time.perf_counter()
+        result = analyze(command)
+        return {"command": command, "result": result, "latency": time.perf_counter() - start}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(timed, commands))
+
+def set_intent_examples(examples: list):
+    """Replace the few-shot examples; the prompt prefix is rebuilt and cached intents from the old prompt stop matching."""
+    if intent_prompt.set_examples(examples):
+        intent_cache.version = intent_prompt.version
+        reprime_intent_prompt()
+
+def reprime_intent_prompt() -> threading.Thread:
+    """Re-evaluate the intent prefix in the background, e.g. after a long unrelated generation evicted it."""
+    thread = threading.Thread(target=intent_prompt.prime, daemon=True)
+    thread.start()
+    return thread
+
+def _analyze_command_uncached(command: str) -> dict:
+    """Runs the intent prompt through Ollama in JSON mode, falling back to regexes when no intent can be recovered."""
+    timings = {}
+    llm_raw_output = get_ollama_json_response(
+        intent_prompt.command_prompt(command), system=intent_prompt.system, timings=timings
+    )
+    if "first_token_ms" in timings:
+        intent_prompt.record_call(timings["first_token_ms"])
 
     if llm_raw_output:
-        try:
-            json_string = llm_raw_output.strip()
-            parsed_response = json.loads(json_string)
-            
-            intent = parsed_response.get("intent", "unknown")
+        # Tolerates trailing prose and truncated objects, salvaging whatever members are complete.
+        parsed_response, repaired = loads_lenient(llm_raw_output)
+        if isinstance(parsed_response, dict) and isinstance(parsed_response.get("intent"), str) and parsed_response["intent"]:
+            if not isinstance(parsed_response.get("entities"), dict):
+                parsed_response["entities"] = {}
+
+            intent = parsed_response["intent"]
             # Keep existing logic for read_unread_emails if needed, but ensure it doesn't conflict with new intent
             if "email" in intent.lower() and "read" in intent.lower() and "count" not in intent.lower():
                 parsed_response["intent"] = "read_unread_emails"
             
+            # A repaired object may have lost members, so it is used once but never cached or learned from.
+            parsed_response["source"] = "llm_repaired" if repaired else "llm"
             return parsed_response
-        except json.JSONDecodeError:
-            print(f"Could not parse Ollama response as JSON: {llm_raw_output}")
-            
-            # Fallback for email reading if LLM fails to parse JSON
-            email_read_pattern = r'(read|check|show).*email.*(from|google)'
-            if re.search(email_read_pattern, command, re.IGNORECASE):
-                sender_match = re.search(r'from\s+([\w@\.\-]+)', command, re.IGNORECASE)
-                if sender_match:
-                    sender = sender_match.group(1)
-                    if '@' in sender:
-                        return {"intent": "read_unread_emails", "entities": {"sender_email": sender}}
-                    else:
-                        return {"intent": "read_unread_emails", "entities": {"sender_name": sender}}
-                else:
-                    return {"intent": "read_unread_emails", "entities": {}}
-            
-            # Fallback for email counting if LLM fails to parse JSON
-            email_count_pattern = r'(count|how many).*unread email'
-            if re.search(email_count_pattern, command, re.IGNORECASE):
-                return {"intent": "read_unread_emails", "entities": {}}
 
-            return {"intent": "unknown", "entities": {}}
-    return {"intent": "unknown", "entities": {}}
+        print(f"Could not parse Ollama response as JSON: {llm_raw_output}")
+        return _fallback_intent(command)
+    return {"intent": "unknown", "entities": {}, "source": "llm"}
+
+def _fallback_intent(command: str) -> dict:
+    """Regex intent extraction used when the LLM output cannot be parsed."""
+    # Bulk actions come first: "mark all emails from X as read" would also match the reading pattern.
+    if re.search(r'mark.*(email|mail|message).*read', command, re.IGNORECASE):
+        sender_match = re.search(r'from\s+([\w@\.\-]+)', command, re.IGNORECASE)
+        entities = {}
+        if sender_match:
+            sender = sender_match.group(1)
+            entities = {"sender_email": sender} if '@' in sender else {"sender_name": sender}
+        return {"intent": "mark_emails_read", "entities": entities, "source": "fallback"}
+    if re.search(r'archive.*newsletter', command, re.IGNORECASE):
+        return {"intent": "archive_newsletters", "entities": {}, "source": "fallback"}
+
+    # Fallback for email reading if LLM fails to parse JSON
+    email_read_pattern = r'(read|check|show).*email.*(from|google)'
+    if re.search(email_read_pattern, command, re.IGNORECASE):
+        sender_match = re.search(r'from\s+([\w@\.\-]+)', command, re.IGNORECASE)
+        if sender_match:
+            sender = sender_match.group(1)
+            if '@' in sender:
+                return {"intent": "read_unread_emails", "entities": {"sender_email": sender}, "source": "fallback"}
+            else:
+                return {"intent": "read_unread_emails", "entities": {"sender_name": sender}, "source": "fallback"}
+        else:
+            return {"intent": "read_unread_emails", "entities": {}, "source": "fallback"}
+    
+    # Fallback for email counting if LLM fails to parse JSON
+    email_count_pattern = r'(count|how many).*unread email'
+    if re.search(email_count_pattern, command, re.IGNORECASE):
+        return {"intent": "read_unread_emails", "entities": {}, "source": "fallback"}
+
+    return {"intent": "unknown", "entities": {}, "source": "fallback"}
 
 if __name__ == "__main__":
     print("Testing Ollama LLM integration...")
@@ -171,3 +550,8 @@ if __name__ == "__main__":
     for test_command in test_commands:
         result = analyze_command_with_ollama(test_command)
         print(f"Command: '{test_command}' -> Result: {result}")
+
+    print(f"Intent cache: {intent_cache.stats()}")
+    print(f"Intent paths: {get_intent_path_stats()}")
+    print(f"Ollama timings: {get_ollama_metrics()}")
+    print(f"Intent prompt prefix: {intent_prompt.stats()}")
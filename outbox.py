@@ -0,0 +1,179 @@
+import base64
+import sqlite3
+import threading
+import time
+from email.utils import make_msgid
+
+from googleapiclient.errors import HttpError
+
+
+OUTBOX_PATH = "outbox.db"
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 5  # seconds before the first retry, doubled after each failure
+BACKOFF_MAX = 600
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    key TEXT PRIMARY KEY,
+    recipients TEXT,
+    subject TEXT,
+    raw TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    sent_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt);
+"""
+
+
+class Outbox:
+    """
+    Persistent queue of outgoing mail, sent by a background worker with retry and exponential backoff.
+    Each message's Message-ID is its idempotency key: enqueueing the same message twice stores it once, and
+    before a retry the Sent folder is searched for it so a send whose response was lost is not repeated.
+    Pending mail is kept in SQLite and picked up again when the worker next starts.
+    """
+
+    def __init__(self, path: str = OUTBOX_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._listeners = []
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            # A send interrupted by a restart is retried; the Sent folder check keeps it from going out twice.
+            self._conn.execute("UPDATE outbox SET status = 'pending', attempts = MAX(attempts, 1) WHERE status = 'sending'")
+            self._conn.commit()
+
+    def add_listener(self, callback):
+        """callback(entry, error) is called after each message is sent (error None) or given up on."""
+        self._listeners.append(callback)
+
+    def enqueue(self, message) -> str:
+        """Store a MIME message for sending and return its idempotency key (the Message-ID)."""
+        if not message['Message-ID']:
+            message['Message-ID'] = make_msgid()
+        key = message['Message-ID']
+        raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (key, recipients, subject, raw, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, message['To'], message['Subject'], raw, time.time()),
+            )
+            self._conn.commit()
+        self._wake.set()
+        return key
+
+    def pending(self) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM outbox WHERE status IN ('pending', 'sending') ORDER BY created_at"
+            )
+            return [dict(row) for row in rows]
+
+    def _next_due(self) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt <= ? ORDER BY created_at LIMIT 1",
+                (time.time(),),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE outbox SET status = 'sending' WHERE key = ?", (row['key'],))
+            self._conn.commit()
+            return dict(row)
+
+    def _seconds_until_due(self) -> float | None:
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_attempt) FROM outbox WHERE status = 'pending'").fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def _update(self, key: str, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE outbox SET {assignments} WHERE key = ?", (*fields.values(), key))
+            self._conn.commit()
+
+    def _already_sent(self, service, key: str) -> str | None:
+        """Id of a sent message with this Message-ID, if an earlier attempt got through."""
+        response = service.users().messages().list(userId='me', q=f'rfc822msgid:{key} in:sent', maxResults=1).execute()
+        messages = response.get('messages', [])
+        return messages[0]['id'] if messages else None
+
+    def _send(self, service, entry: dict):
+        try:
+            sent_id = self._already_sent(service, entry['key']) if entry['attempts'] else None
+            if sent_id is None:
+                sent_id = service.users().messages().send(userId='me', body={'raw': entry['raw']}).execute().get('id')
+        except Exception as e:
+            # Network and transport errors are retried; HTTP errors only when the status is transient.
+            attempts = entry['attempts'] + 1
+            retryable = not isinstance(e, HttpError) or e.resp.status in RETRYABLE_STATUSES
+            if retryable and attempts < MAX_ATTEMPTS:
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+                self._update(entry['key'], status='pending', attempts=attempts, next_attempt=time.time() + delay,
+                             error=str(e))
+                print(f"Outbox: sending to {entry['recipients']} failed ({e}); retrying in {delay} seconds.")
+                return
+            self._update(entry['key'], status='failed', attempts=attempts, error=str(e))
+            entry.update(status='failed', error=str(e))
+            print(f"Outbox: failed to send email to {entry['recipients']}: {e}")
+            self._notify(entry, str(e))
+            return
+
+        self._update(entry['key'], status='sent', attempts=entry['attempts'] + 1, sent_id=sent_id, error=None)
+        entry.update(status='sent', sent_id=sent_id)
+        print(f"Outbox: email to {entry['recipients']} sent.")
+        self._notify(entry, None)
+
+    def _notify(self, entry: dict, error: str | None):
+        for callback in self._listeners:
+            try:
+                callback(entry, error)
+            except Exception as e:
+                print(f"Outbox listener error: {e}")
+
+    def start(self, service_factory) -> threading.Thread:
+        """
+        Send queued mail on a daemon thread. service_factory is called on that thread to get a Gmail
+        service (see google_service.PeriodicSync for why).
+        """
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop_event.clear()
+
+        def run():
+            service = None
+            while not self._stop_event.is_set():
+                entry = self._next_due()
+                if entry is None:
+                    self._wake.wait(self._seconds_until_due())
+                    self._wake.clear()
+                    continue
+                try:
+                    service = service or service_factory()
+                except Exception as e:
+                    # No service (e.g. offline while refreshing the token); try again after a backoff.
+                    self._update(entry['key'], status='pending', next_attempt=time.time() + BACKOFF_BASE,
+                                 error=str(e))
+                    print(f"Outbox: could not connect to Gmail: {e}")
+                    continue
+                self._send(service, entry)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
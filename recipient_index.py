@@ -0,0 +1,102 @@
+import heapq
+import re
+import threading
+from collections import Counter, defaultdict
+
+import Levenshtein
+
+
+NGRAM = 3
+MAX_CANDIDATES = 100  # addresses scored with Levenshtein after the n-gram filter
+STOP_GRAM_RATIO = 0.2  # n-grams in more than this share of addresses (e.g. "com") are too common to filter on
+_NAME_SEPARATORS = re.compile(r"[._\-+0-9]+")
+
+
+def name_parts(address: str) -> list:
+    """The name parts of an address's local part: "jane.doe_99@x.com" -> ["jane", "doe"]."""
+    return [part for part in _NAME_SEPARATORS.split(address.split('@')[0]) if part]
+
+
+class RecipientIndex:
+    """
+    Character n-gram inverted index over recipient addresses for fuzzy lookup.
+    A search only computes Levenshtein distances for the addresses sharing the most n-grams with the query,
+    so lookups stay fast with tens of thousands of contacts. Addresses can be added at any time.
+    """
+
+    def __init__(self, usage=None, n: int = NGRAM):
+        # usage(address) returns the address book entry ({'count', 'last_used'}) used to break ties.
+        self.usage = usage
+        self.n = n
+        self._addresses = {}
+        self._postings = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def _grams(self, text: str) -> set:
+        padded = f"^{text}$"
+        return {padded[i:i + self.n] for i in range(max(1, len(padded) - self.n + 1))}
+
+    def add(self, address: str):
+        key = address.strip().lower()
+        if not key:
+            return
+        with self._lock:
+            if key in self._addresses:
+                return
+            self._addresses[key] = address.strip()
+            grams = self._grams(key)
+            for part in name_parts(key):
+                grams |= self._grams(part)
+            for gram in grams:
+                self._postings[gram].add(key)
+
+    def add_all(self, addresses):
+        for address in addresses:
+            self.add(address)
+
+    def __len__(self):
+        return len(self._addresses)
+
+    def _candidates(self, query: str) -> list:
+        postings = sorted((self._postings[gram] for gram in self._grams(query) if gram in self._postings), key=len)
+        limit = max(1, int(len(self._addresses) * STOP_GRAM_RATIO))
+        selective = [keys for keys in postings if len(keys) <= limit] or postings[:1]
+        overlap = Counter()
+        for keys in selective:
+            overlap.update(keys)
+        return [key for key, _ in heapq.nlargest(MAX_CANDIDATES, overlap.items(), key=lambda item: item[1])]
+
+    def search(self, query: str, k: int = 3) -> list:
+        """
+        Return up to k (address, distance) pairs, closest first and then most used / most recently used.
+        A query without '@' (a spoken name) is compared against the part before the '@' and against each of its
+        name parts, so "jane" finds jane.doe@gmail.com; a match on the whole local part ranks first.
+        Matches further than half the query length (at least 2 edits) away are dropped.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        max_distance = max(2, len(query) // 2)
+        with self._lock:
+            candidates = self._candidates(query)
+            scored = []
+            for key in candidates:
+                target = key if '@' in query else key.split('@')[0]
+                distance = Levenshtein.distance(query, target)
+                partial = False
+                if '@' not in query:
+                    part_distance = min((Levenshtein.distance(query, part) for part in name_parts(key)),
+                                        default=distance)
+                    if part_distance < distance:
+                        distance, partial = part_distance, True
+                if distance <= max_distance:
+                    scored.append((key, distance, partial))
+            addresses = dict(self._addresses)
+
+        def rank(item):
+            key, distance, partial = item
+            entry = (self.usage(key) if self.usage else None) or {}
+            return distance, partial, -entry.get('count', 0), -entry.get('last_used', 0.0)
+
+        scored.sort(key=rank)
+        return [(addresses[key], distance) for key, distance, _ in scored[:k]]
@@ -1,16 +1,23 @@
-import os
-import pickle
+import time
 import pyttsx3
 import speech_recognition as sr
 from datetime import datetime, timedelta
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from google_service import GoogleServiceProvider
+from reminder_store import ReminderStore
+from reminder_scheduler import ReminderScheduler
+from reminder_index import ReminderIndex
+from announcements import announce
+from time_parser import TimeParser
 
 
 engine = pyttsx3.init()
 recognizer = sr.Recognizer()
 SCOPES = ['https://www.googleapis.com/auth/calendar']
+REMINDER_TIMEZONE = 'Asia/Kolkata'
+REMINDER_DURATION = timedelta(hours=1)
+calendar_provider = GoogleServiceProvider('calendar', 'v3', SCOPES, 'token1.pickle', 'credentials1.json')
+time_parser = TimeParser(REMINDER_TIMEZONE)
+reminder_store = ReminderStore(tz=time_parser.tzinfo)
 
 def speak(text):
     """Convert text to speech."""
@@ -34,21 +41,69 @@ def get_audio(prompt=None):
             return None
 
 def authenticate_google_calendar():
-    """Authenticate and return the Google Calendar service."""
-    creds = None
-    if os.path.exists('token1.pickle'):
-        with open('token1.pickle', 'rb') as token:
-            creds = pickle.load(token)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file('credentials1.json', SCOPES)
-            creds = flow.run_local_server(port=0)
-        with open('token1.pickle', 'wb') as token:
-            pickle.dump(creds, token)
-    service = build('calendar', 'v3', credentials=creds)
-    return service
+    """Return the cached Calendar service for this thread; credentials are loaded once and refreshed before expiry."""
+    return calendar_provider.service()
+
+def _on_reminder_due(reminder_id, summary, due_ts, missed):
+    if missed:
+        when = time_parser.from_timestamp(due_ts).strftime("%d-%m-%Y at %H:%M")
+        print(f"Reminder missed: {summary} (due {when})")
+        announce(f"You missed a reminder on {when}: {summary}")
+    else:
+        print(f"Reminder due: {summary}")
+        announce(f"Reminder: {summary}")
+
+reminder_scheduler = ReminderScheduler(on_due=_on_reminder_due)
+
+def _schedule_from_store(event_id, row):
+    """
+    Mirror store changes into the local scheduler. An event removed, or moved to a time already past, is
+    cancelled; one still due at the time it was scheduled for is kept, so a missed reminder is caught up.
+    """
+    if row is None or row['start_ts'] is None:
+        reminder_scheduler.cancel(event_id)
+    elif row['start_ts'] > time.time():
+        reminder_scheduler.schedule(event_id, row['summary'], row['start_ts'])
+    elif reminder_scheduler.due_time(event_id) != row['start_ts']:
+        reminder_scheduler.cancel(event_id)
+
+reminder_store.add_listener(_schedule_from_store)
+
+# Summary lookup over every future reminder in the store, for delete_reminder.
+reminder_index = ReminderIndex()
+reminder_index.add_all(reminder_store.upcoming())
+reminder_store.add_listener(reminder_index.update)
+
+def start_reminder_sync():
+    """
+    Start the local scheduler, which announces reminders (and catches up on ones missed while the assistant
+    was off), and keep the reminder store current on a background thread.
+    """
+    reminder_scheduler.start()
+    return reminder_store.start_background_sync(authenticate_google_calendar)
+
+def _local_reminders(limit=None):
+    """Upcoming reminders from the local store, syncing first if it has never been loaded."""
+    if not reminder_store.is_ready():
+        reminder_store.sync(authenticate_google_calendar())
+    return reminder_store.upcoming(limit)
+
+def build_reminder_event(dt, note, recurrence=None):
+    """Calendar event body for a reminder at the naive local datetime dt, optionally repeating by RRULE lines."""
+    event = {
+        'summary': note,
+        'start': {
+            'dateTime': dt.isoformat(),
+            'timeZone': REMINDER_TIMEZONE,
+        },
+        'end': {
+            'dateTime': (dt + REMINDER_DURATION).isoformat(),
+            'timeZone': REMINDER_TIMEZONE,
+        },
+    }
+    if recurrence:
+        event['recurrence'] = list(recurrence)
+    return event
 
 def schedule_reminder(date_str, time_str, note):
     """Schedule a reminder in Google Calendar."""
@@ -57,19 +112,10 @@ def schedule_reminder(date_str, time_str, note):
         dt = datetime.strptime(f"{date_str} {time_str}", "%d-%m-%Y %H:%M")
         service = authenticate_google_calendar()
 
-        event = {
-            'summary': note,
-            'start': {
-                'dateTime': dt.isoformat(),
-                'timeZone': 'Asia/Kolkata',  
-            },
-            'end': {
-                'dateTime': (dt + timedelta(hours=1)).isoformat(),  
-                'timeZone': 'Asia/Kolkata',  
-            },
-        }
-
-        service.events().insert(calendarId='primary', body=event).execute()
+        event = build_reminder_event(dt, note)
+
+        created = service.events().insert(calendarId='primary', body=event).execute()
+        reminder_store.upsert(created)
         speak(f"Reminder set for {date_str} at {time_str}.")
     except ValueError:
         speak("I couldn't understand the date or time format provided. Please try again.")
@@ -82,23 +128,26 @@ def set_reminder(date_str: str = None, time_str: str = None, note: str = None):
     speak("Let's set a reminder.")
 
     if not date_str:
-        date_input = get_audio("Say the date in day month year format, like sixteen May twenty twenty five.")
+        date_input = get_audio("Say the date, like tomorrow, next Friday or sixteen May twenty twenty five.")
         if not date_input:
             speak("Date not recognized.")
             return
-        try:
-            date_obj = datetime.strptime(date_input, "%d %B %Y")
-            date_str = date_obj.strftime("%d-%m-%Y")
-        except Exception:
+        date_obj = time_parser.parse_date(date_input)
+        if not date_obj:
             speak("Couldn't understand the date format. Please try again.")
             return
+        date_str = date_obj.strftime("%d-%m-%Y")
 
     if not time_str:
-        time_input = get_audio("Say the time in 24-hour format, like fifteen thirty or 4:30.")
+        time_input = get_audio("Say the time, like 5 PM or fifteen thirty.")
         if not time_input:
             speak("Time not recognized.")
             return
-        time_str = time_input  
+        clock = time_parser.parse_time(time_input)
+        if not clock:
+            speak("Couldn't understand the time. Please try again.")
+            return
+        time_str = f"{clock[0]:02d}:{clock[1]:02d}"
 
     if not note:
         note = get_audio("What should I remind you about?")
@@ -109,11 +158,8 @@ def set_reminder(date_str: str = None, time_str: str = None, note: str = None):
     schedule_reminder(date_str, time_str, note)
 
 def list_reminders():
-    """List upcoming reminders from Google Calendar."""
-    service = authenticate_google_calendar()
-    now = datetime.utcnow().isoformat() + 'Z'  
-    events_result = service.events().list(calendarId='primary', timeMin=now, maxResults=10, singleEvents=True, orderBy='startTime').execute()
-    events = events_result.get('items', [])
+    """List upcoming reminders, answered from the local store."""
+    events = _local_reminders(limit=10)
 
     if not events:
         speak("No upcoming reminders found.")
@@ -121,7 +167,7 @@ def list_reminders():
     else:
         speak("Here are your upcoming reminders:")
         for event in events:
-            start = event['start'].get('dateTime', event['start'].get('date'))
+            start = event['start']
             summary = event['summary']
             print(f"{start}: {summary}")
             speak(f"{start}: {summary}")
@@ -139,19 +185,28 @@ def delete_reminder(summary_to_delete: str = None):
         speak("No summary recognized. Cannot delete reminder.")
         return
 
-    now = datetime.utcnow().isoformat() + 'Z'  
-    events_result = service.events().list(calendarId='primary', timeMin=now, maxResults=10, singleEvents=True, orderBy='startTime').execute()
-    events = events_result.get('items', [])
-
-    found_and_deleted = False
-    for event in events:
-        if event['summary'].lower() == summary_to_delete.lower(): 
-            service.events().delete(calendarId='primary', eventId=event['id']).execute()
-            speak(f"Reminder '{summary_to_delete}' has been deleted.")
-            print(f"Deleted reminder: {summary_to_delete}")
-            found_and_deleted = True
-            break  
+    if not reminder_store.is_ready():
+        reminder_store.sync(service)
+    matches = reminder_index.search(summary_to_delete)
 
-    if not found_and_deleted:
+    event = None
+    if matches and matches[0][1] == 1.0:
+        event = matches[0][0]
+    else:
+        # Not an exact match; the summary may have been misheard, so confirm each candidate.
+        for candidate, _ in matches:
+            start = time_parser.from_timestamp(candidate['start_ts']).strftime("%d-%m-%Y at %H:%M")
+            speak(f"Did you mean '{candidate['summary']}' on {start}?")
+            confirmation = get_audio("Say yes to delete it or no.")
+            if confirmation and "yes" in confirmation:
+                event = candidate
+                break
+
+    if event:
+        service.events().delete(calendarId='primary', eventId=event['id']).execute()
+        reminder_store.delete(event['id'])
+        speak(f"Reminder '{event['summary']}' has been deleted.")
+        print(f"Deleted reminder: {event['summary']}")
+    else:
         speak("No reminder found with that summary.")
         print("No reminder found with that summary.")
@@ -0,0 +1,100 @@
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+
+import Levenshtein
+
+
+STOP_WORDS = {"a", "an", "the", "to", "my", "me", "about", "for", "of", "reminder", "remind", "on", "at", "and"}
+FUZZY_TOKEN_RATIO = 0.75  # a dictated word matches an indexed word this similar, e.g. "by" / "buy"
+MIN_SCORE = 0.5
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list:
+    """Lower-case word tokens without punctuation or filler words."""
+    tokens = _TOKEN.findall((text or "").lower())
+    return [token for token in tokens if token not in STOP_WORDS] or tokens
+
+
+class ReminderIndex:
+    """
+    Inverted index from summary tokens to reminders, for resolving a spoken summary to an event.
+    Query words are matched exactly or to similar indexed words, weighted by how rare each word is, and the
+    result is scored against both the query and the summary length, so "by milk" finds "Buy milk" but not
+    "Buy milk and eggs for the party" first. Ties go to the soonest reminder.
+    """
+
+    def __init__(self):
+        self._docs = {}  # id -> (tokens, row)
+        self._postings = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _remove(self, event_id: str):
+        doc = self._docs.pop(event_id, None)
+        if doc is None:
+            return
+        for token in doc[0]:
+            self._postings[token].discard(event_id)
+            if not self._postings[token]:
+                del self._postings[token]
+
+    def update(self, event_id: str, row: dict | None):
+        """Add, replace or (row None) remove a reminder; matches the ReminderStore listener signature."""
+        with self._lock:
+            self._remove(event_id)
+            if row is None:
+                return
+            tokens = set(tokenize(row.get('summary', "")))
+            self._docs[event_id] = (tokens, row)
+            for token in tokens:
+                self._postings[token].add(event_id)
+
+    def add_all(self, rows):
+        for row in rows:
+            self.update(row['id'], row)
+
+    def _idf(self, token: str) -> float:
+        return math.log(1 + len(self._docs) / (1 + len(self._postings.get(token, ()))))
+
+    def search(self, query: str, k: int = 3, now: float = None) -> list:
+        """Up to k (row, score) pairs for reminders starting from now on, best first; score 1.0 is an exact match."""
+        now = now if now is not None else time.time()
+        query_tokens = set(tokenize(query))
+        if not query_tokens:
+            return []
+        with self._lock:
+            matched = defaultdict(dict)  # id -> {query token: similarity}
+            for query_token in query_tokens:
+                # Exact postings when the word is indexed; otherwise scan the vocabulary for similar words.
+                tokens = [query_token] if query_token in self._postings else list(self._postings)
+                for token in tokens:
+                    similarity = 1.0 if token == query_token else Levenshtein.ratio(query_token, token)
+                    if similarity < FUZZY_TOKEN_RATIO:
+                        continue
+                    weight = similarity * self._idf(token)
+                    for event_id in self._postings[token]:
+                        best = matched[event_id].get(query_token, 0.0)
+                        matched[event_id][query_token] = max(best, weight)
+
+            query_weight = sum(self._idf(token) for token in query_tokens)
+            scored = []
+            for event_id, weights in matched.items():
+                tokens, row = self._docs[event_id]
+                if row.get('start_ts') is None or row['start_ts'] < now:
+                    continue
+                doc_weight = sum(self._idf(token) for token in tokens)
+                hit = sum(weights.values())
+                # Harmonic mean of how much of the query and how much of the summary is covered.
+                recall, precision = hit / query_weight, hit / doc_weight if doc_weight else 0.0
+                score = 2 * recall * precision / (recall + precision) if recall + precision else 0.0
+                if score >= MIN_SCORE:
+                    scored.append((row, round(score, 3)))
+
+        scored.sort(key=lambda item: (-item[1], item[0]['start_ts']))
+        return scored[:k]
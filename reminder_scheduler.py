@@ -0,0 +1,147 @@
+import heapq
+import sqlite3
+import threading
+import time
+
+
+SCHEDULE_PATH = "reminder_schedule.db"
+LATE_TOLERANCE = 60  # seconds past due before a reminder counts as missed
+MISSED_GRACE = 24 * 3600  # missed reminders older than this are dropped instead of announced
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled (
+    id TEXT PRIMARY KEY,
+    summary TEXT,
+    due_ts REAL NOT NULL
+);
+"""
+
+
+class ReminderScheduler:
+    """
+    Fires reminders locally at their due time, with or without a network connection.
+    Due times sit in a min-heap watched by a single thread that sleeps until the earliest one; scheduling and
+    cancelling are O(log n), with cancelled heap entries skipped when they surface. The schedule is persisted
+    to SQLite, so reminders that came due while the assistant was not running are announced on the next start.
+    on_due(reminder_id, summary, due_ts, missed) is called on the scheduler thread.
+    """
+
+    def __init__(self, path: str = SCHEDULE_PATH, on_due=None, missed_grace: float = MISSED_GRACE):
+        self.path = path
+        self.on_due = on_due
+        self.missed_grace = missed_grace
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._entries = {}  # id -> (due_ts, summary)
+        self._heap = []  # (due_ts, id); may hold stale entries for rescheduled or cancelled reminders
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        with self._cond:
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+            for reminder_id, summary, due_ts in self._conn.execute("SELECT id, summary, due_ts FROM scheduled"):
+                self._entries[reminder_id] = (due_ts, summary)
+            self._heap = [(due_ts, reminder_id) for reminder_id, (due_ts, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def schedule(self, reminder_id: str, summary: str, due_ts: float):
+        """Add a reminder, or move it if it is already scheduled."""
+        with self._cond:
+            if self._entries.get(reminder_id) == (due_ts, summary):
+                return
+            self._entries[reminder_id] = (due_ts, summary)
+            heapq.heappush(self._heap, (due_ts, reminder_id))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scheduled (id, summary, due_ts) VALUES (?, ?, ?)", (reminder_id, summary, due_ts)
+            )
+            self._conn.commit()
+            self._cond.notify()
+
+    def cancel(self, reminder_id: str) -> bool:
+        with self._cond:
+            if self._entries.pop(reminder_id, None) is None:
+                return False
+            self._conn.execute("DELETE FROM scheduled WHERE id = ?", (reminder_id,))
+            self._conn.commit()
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                # Mostly stale entries; rebuild so the heap does not grow without bound.
+                self._heap = [(due_ts, rid) for rid, (due_ts, _) in self._entries.items()]
+                heapq.heapify(self._heap)
+            self._cond.notify()
+            return True
+
+    def due_time(self, reminder_id: str) -> float | None:
+        """When a reminder is scheduled to fire, or None if it is not scheduled."""
+        with self._cond:
+            entry = self._entries.get(reminder_id)
+            return entry[0] if entry else None
+
+    def next_due(self) -> float | None:
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self):
+        while self._heap:
+            due_ts, reminder_id = self._heap[0]
+            entry = self._entries.get(reminder_id)
+            if entry is not None and entry[0] == due_ts:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, now: float) -> list:
+        due = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            due_ts, reminder_id = heapq.heappop(self._heap)
+            _, summary = self._entries.pop(reminder_id)
+            due.append((reminder_id, summary, due_ts))
+            self._drop_stale()
+        if due:
+            self._conn.executemany("DELETE FROM scheduled WHERE id = ?", [(reminder_id,) for reminder_id, _, _ in due])
+            self._conn.commit()
+        return due
+
+    def _fire(self, reminder_id: str, summary: str, due_ts: float, now: float):
+        late = now - due_ts
+        if late > self.missed_grace:
+            print(f"Dropped reminder '{summary}', missed by {late / 3600:.0f} hours.")
+            return
+        if self.on_due:
+            try:
+                self.on_due(reminder_id, summary, due_ts, late > LATE_TOLERANCE)
+            except Exception as e:
+                print(f"Reminder callback error: {e}")
+
+    def start(self) -> threading.Thread:
+        """Run the scheduler thread. Reminders that came due while stopped fire first, flagged as missed."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stopped = False
+
+        def run():
+            while True:
+                with self._cond:
+                    while True:
+                        if self._stopped:
+                            return
+                        now = time.time()
+                        due = self._pop_due(now)
+                        if due:
+                            break
+                        timeout = self._heap[0][0] - now if self._heap else None
+                        self._cond.wait(timeout)
+                for reminder_id, summary, due_ts in due:
+                    self._fire(reminder_id, summary, due_ts, now)
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
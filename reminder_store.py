@@ -0,0 +1,191 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from googleapiclient.errors import HttpError
+
+from google_service import PeriodicSync
+from sqlite_meta import META_SCHEMA, get_meta, set_meta
+
+
+REMINDER_STORE_PATH = "reminders.db"
+CALENDAR_ID = 'primary'
+SYNC_INTERVAL = 300  # seconds between background syncs
+SYNC_LOOKBACK = timedelta(days=7)  # how far back the first full sync reaches
+PAGE_SIZE = 2500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    summary TEXT,
+    start TEXT,
+    start_ts REAL,
+    end TEXT,
+    recurring_event_id TEXT,
+    updated TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_start ON events (start_ts);
+""" + META_SCHEMA
+
+
+def event_start(event: dict, tz=None) -> datetime | None:
+    """
+    Start of a Calendar event as an aware datetime. All-day events start at midnight in tz, or in the
+    system's local time if tz is None.
+    """
+    start = event.get('start', {})
+    value = start.get('dateTime') or start.get('date')
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz) if tz is not None else parsed.astimezone()
+    return parsed
+
+
+class ReminderStore:
+    """
+    Local SQLite copy of the calendar's events, kept current with Calendar sync tokens.
+    The first sync lists events from SYNC_LOOKBACK ago onwards; later syncs fetch only what changed since the
+    stored nextSyncToken, and start over when Google reports the token expired (410 Gone).
+    """
+
+    def __init__(self, path: str = REMINDER_STORE_PATH, calendar_id: str = CALENDAR_ID, tz=None):
+        self.path = path
+        self.calendar_id = calendar_id
+        self.tz = tz  # zone of all-day events; the system's local time if None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._syncer = PeriodicSync(self.sync, "Reminder")
+        self._listeners = []
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def add_listener(self, callback):
+        """
+        callback(event_id, row) is called after an event is added or changed (row is its stored columns)
+        and after it is removed (row is None), e.g. to keep a scheduler or search index current.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, changes: list):
+        for event_id, row in changes:
+            for callback in self._listeners:
+                try:
+                    callback(event_id, row)
+                except Exception as e:
+                    print(f"Reminder store listener error: {e}")
+
+    @property
+    def sync_token(self) -> str | None:
+        with self._lock:
+            return get_meta(self._conn, "sync_token")
+
+    def is_ready(self) -> bool:
+        """True once a full sync has completed, so the store can answer queries on its own."""
+        return self.sync_token is not None
+
+    def _upsert(self, event: dict) -> tuple:
+        """Store or remove one event; returns the (event_id, row) change for listeners."""
+        if event.get('status') == 'cancelled':
+            self._conn.execute("DELETE FROM events WHERE id = ?", (event['id'],))
+            return event['id'], None
+        start = event_start(event, self.tz)
+        row = {
+            'id': event['id'],
+            'summary': event.get('summary', ""),
+            'start': event.get('start', {}).get('dateTime') or event.get('start', {}).get('date'),
+            'start_ts': start.timestamp() if start else None,
+            'end': event.get('end', {}).get('dateTime') or event.get('end', {}).get('date'),
+            'recurring_event_id': event.get('recurringEventId'),
+            'updated': event.get('updated'),
+        }
+        self._conn.execute(
+            "INSERT OR REPLACE INTO events (id, summary, start, start_ts, end, recurring_event_id, updated) "
+            "VALUES (:id, :summary, :start, :start_ts, :end, :recurring_event_id, :updated)",
+            row,
+        )
+        return event['id'], row
+
+    def upsert(self, event: dict):
+        """Apply an event created or changed locally (e.g. just inserted) without waiting for the next sync."""
+        with self._lock:
+            change = self._upsert(event)
+            self._conn.commit()
+        self._notify([change])
+
+    def delete(self, event_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+            self._conn.commit()
+        self._notify([(event_id, None)])
+
+    def _list_pages(self, service, **params):
+        events = []
+        page_token = None
+        while True:
+            response = service.events().list(
+                calendarId=self.calendar_id, singleEvents=True, maxResults=PAGE_SIZE, pageToken=page_token, **params
+            ).execute()
+            events.extend(response.get('items', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return events, response.get('nextSyncToken')
+
+    def full_sync(self, service):
+        """Rebuild the store from the calendar and keep the sync token for incremental syncs."""
+        time_min = (datetime.now(timezone.utc) - SYNC_LOOKBACK).isoformat()
+        events, sync_token = self._list_pages(service, timeMin=time_min)
+        with self._lock:
+            old_ids = {row['id'] for row in self._conn.execute("SELECT id FROM events")}
+            self._conn.execute("DELETE FROM events")
+            changes = [self._upsert(event) for event in events]
+            kept = {event_id for event_id, row in changes if row is not None}
+            changes += [(event_id, None) for event_id in old_ids - kept]
+            set_meta(self._conn, "sync_token", sync_token)
+            self._conn.commit()
+        self._notify(changes)
+        print(f"Reminder store loaded {len(events)} events.")
+
+    def sync(self, service):
+        """Apply changes since the stored sync token, falling back to a full sync if it has expired."""
+        sync_token = self.sync_token
+        if sync_token is None:
+            self.full_sync(service)
+            return
+        try:
+            events, next_token = self._list_pages(service, syncToken=sync_token)
+        except HttpError as e:
+            if e.resp.status == 410:
+                # The sync token is no longer valid; start over.
+                with self._lock:
+                    set_meta(self._conn, "sync_token", None)
+                    self._conn.commit()
+                self.full_sync(service)
+                return
+            raise
+        with self._lock:
+            changes = [self._upsert(event) for event in events]
+            set_meta(self._conn, "sync_token", next_token or sync_token)
+            self._conn.commit()
+        self._notify(changes)
+
+    def start_background_sync(self, service_factory, interval: float = SYNC_INTERVAL) -> threading.Thread:
+        """Keep the store current on a daemon thread; see PeriodicSync."""
+        return self._syncer.start(service_factory, interval)
+
+    def stop_background_sync(self):
+        self._syncer.stop()
+
+    def upcoming(self, limit: int = None, now: float = None) -> list:
+        """Events starting from now on, soonest first."""
+        sql = "SELECT * FROM events WHERE start_ts >= ? ORDER BY start_ts"
+        params = [now if now is not None else time.time()]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
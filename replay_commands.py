@@ -0,0 +1,109 @@
+"""
+Replay a transcript of voice commands through intent analysis and report latencies.
+
+Usage:
+    python replay_commands.py transcript.txt --output results.jsonl --workers 4
+    python replay_commands.py transcript.txt --llm-only --stats stats.json
+
+The transcript is one command per line (blank lines and lines starting with # are skipped),
+or JSON lines with a "command" field.
+"""
+import argparse
+import json
+import math
+import time
+
+from ollama_llm import analyze_commands, get_intent_path_stats, intent_cache, PROMPT_VERSION, OLLAMA_MODEL_NAME
+
+
+def load_transcript(path: str) -> list:
+    commands = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                command = json.loads(line).get("command")
+                if command:
+                    commands.append(command)
+            else:
+                commands.append(line)
+    return commands
+
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_stats(latencies: list) -> dict:
+    """Latency summary in milliseconds."""
+    millis = [latency * 1000 for latency in latencies]
+    return {
+        "count": len(millis),
+        "mean_ms": round(sum(millis) / len(millis), 3) if millis else 0.0,
+        "p50_ms": round(percentile(millis, 50), 3),
+        "p95_ms": round(percentile(millis, 95), 3),
+        "p99_ms": round(percentile(millis, 99), 3),
+        "max_ms": round(max(millis), 3) if millis else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a transcript of commands through intent analysis.")
+    parser.add_argument("transcript", help="file with one command per line")
+    parser.add_argument("--output", default="replay_results.jsonl", help="where to write per-command intents and latencies")
+    parser.add_argument("--stats", help="optional file to write the summary statistics to as JSON")
+    parser.add_argument("--workers", type=int, default=4, help="maximum number of concurrent analyses")
+    parser.add_argument("--llm-only", action="store_true", help="bypass rules, cache and classifier")
+    args = parser.parse_args()
+
+    commands = load_transcript(args.transcript)
+    print(f"Replaying {len(commands)} commands with {args.workers} workers...")
+
+    start = time.perf_counter()
+    results = analyze_commands(commands, max_workers=args.workers, llm_only=args.llm_only)
+    wall_time = time.perf_counter() - start
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        for item in results:
+            f.write(json.dumps({
+                "command": item["command"],
+                "intent": item["result"].get("intent"),
+                "entities": item["result"].get("entities", {}),
+                "source": item["result"].get("source"),
+                "latency_ms": round(item["latency"] * 1000, 3),
+            }) + "\n")
+
+    intents = {}
+    for item in results:
+        intent = item["result"].get("intent")
+        intents[intent] = intents.get(intent, 0) + 1
+
+    stats = {
+        "model": OLLAMA_MODEL_NAME,
+        "prompt_version": PROMPT_VERSION,
+        "workers": args.workers,
+        "llm_only": args.llm_only,
+        "wall_time_s": round(wall_time, 3),
+        "throughput_per_s": round(len(results) / wall_time, 3) if wall_time else 0.0,
+        "latency": latency_stats([item["latency"] for item in results]),
+        "intents": intents,
+        "paths": get_intent_path_stats(),
+        "cache": intent_cache.stats(),
+    }
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+
+    print(json.dumps(stats, indent=2))
+    print(f"Per-command results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+from googleapiclient.errors import HttpError
+
+
+class FakeRequest:
+    def __init__(self, func):
+        self.func = func
+
+    def execute(self):
+        return self.func()
+
+
+class FakeBatch:
+    def __init__(self, callback):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.execute(), None)
+            except Exception as e:
+                self.callback(request_id, None, e)
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = "fake"
+
+
+class FakeGmail:
+    """
+    Just enough of the Gmail API for the mail index: profile, message list/get, history and batches.
+    Messages in mail are {'id', 'from', 'subject', 'labelIds'} dicts, optionally with 'to' and 'date';
+    history records go in records.
+    """
+
+    def __init__(self, messages=(), history_id=100):
+        self.mail = {message['id']: dict(message) for message in messages}
+        self.history_id = history_id
+        self.records = []
+        self.history_expired = False
+        self.calls = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def history(self):
+        return FakeHistory(self)
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(callback)
+
+    def getProfile(self, userId):
+        return FakeRequest(lambda: {'historyId': str(self.history_id)})
+
+    def list(self, userId, q='', maxResults=100, pageToken=None, labelIds=()):
+        def run():
+            self.calls.append(('list', q))
+            matching = [message for message in self.mail.values()
+                        if ('is:unread' not in q or 'UNREAD' in message['labelIds'])
+                        and all(label in message['labelIds'] for label in labelIds)]
+            start = int(pageToken or 0)
+            response = {'messages': [{'id': message['id']} for message in matching[start:start + maxResults]]}
+            if start + maxResults < len(matching):
+                response['nextPageToken'] = str(start + maxResults)
+            return response
+        return FakeRequest(run)
+
+    def get(self, userId, id, format='full', metadataHeaders=None):
+        def run():
+            self.calls.append(('get', id))
+            message = self.mail[id]
+            return {
+                'id': id, 'threadId': id, 'labelIds': list(message['labelIds']), 'snippet': "",
+                'internalDate': str(message.get('date', 0)),
+                'payload': {'headers': [{'name': 'From', 'value': message['from']},
+                                        {'name': 'Subject', 'value': message['subject']},
+                                        {'name': 'To', 'value': message.get('to', "")}]},
+            }
+        return FakeRequest(run)
+
+
+class FakeHistory:
+    def __init__(self, gmail: FakeGmail):
+        self.gmail = gmail
+
+    def list(self, userId, startHistoryId, pageToken=None, **filters):
+        def run():
+            self.gmail.calls.append(('history', startHistoryId))
+            if self.gmail.history_expired:
+                raise HttpError(FakeResponse(404), b'history expired')
+            return {'history': list(self.gmail.records), 'historyId': str(self.gmail.history_id)}
+        return FakeRequest(run)
+
+
+class FakeCalendar:
+    """
+    Calendar events list with sync tokens, insert, delete and batches. Each change is appended to a log and a sync token
+    is the position in it; set token_expired to answer the next sync token with 410 Gone.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.log = []
+        self.token_expired = False
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(callback)
+
+    def list(self, calendarId, singleEvents=True, maxResults=250, pageToken=None, syncToken=None, **params):
+        def run():
+            self.calls.append(('list', syncToken))
+            if syncToken and self.token_expired:
+                self.token_expired = False
+                raise HttpError(FakeResponse(410), b'sync token expired')
+            items = self.log[int(syncToken):] if syncToken else list(self.items.values())
+            start = int(pageToken or 0)
+            response = {'items': items[start:start + maxResults]}
+            if start + maxResults < len(items):
+                response['nextPageToken'] = str(start + maxResults)
+            else:
+                response['nextSyncToken'] = str(len(self.log))
+            return response
+        return FakeRequest(run)
+
+    def insert(self, calendarId, body):
+        def run():
+            event = dict(body, id=f"e{len(self.log) + 1}", status='confirmed')
+            self.items[event['id']] = event
+            self.log.append(event)
+            return event
+        return FakeRequest(run)
+
+    def delete(self, calendarId, eventId):
+        def run():
+            del self.items[eventId]
+            self.log.append({'id': eventId, 'status': 'cancelled'})
+            return ""
+        return FakeRequest(run)
@@ -0,0 +1,79 @@
+import pytest
+
+from address_book import AddressBook
+from fakes import FakeGmail
+
+
+def sent(message_id, to, date=1000):
+    return {'id': message_id, 'from': "Me <me@example.com>", 'subject': "Hello", 'labelIds': ['SENT'],
+            'to': to, 'date': date}
+
+
+@pytest.fixture
+def book(tmp_path):
+    return AddressBook(str(tmp_path / "recipient_book.json"), legacy_path=None)
+
+
+def test_record_counts_each_recipient_and_notifies_new_ones(book):
+    added = []
+    book.add_listener(added.append)
+
+    book.record("Alice <alice@example.com>, bob@example.com", used_at=10.0)
+    book.record("ALICE@example.com", used_at=20.0)
+
+    assert added == ["alice@example.com", "bob@example.com"]
+    assert book.get("alice@example.com") == {'address': "alice@example.com", 'count': 2, 'last_used': 20.0}
+
+
+def test_book_is_saved_and_reloaded(book, tmp_path):
+    book.record("alice@example.com", used_at=10.0)
+
+    reloaded = AddressBook(book.path, legacy_path=None)
+
+    assert reloaded.addresses() == ["alice@example.com"]
+
+
+def test_legacy_recipient_list_is_imported(tmp_path):
+    legacy = tmp_path / "recipient_emails.txt"
+    legacy.write_text("alice@example.com\nBob <bob@example.com>\n")
+
+    book = AddressBook(str(tmp_path / "recipient_book.json"), legacy_path=str(legacy))
+
+    assert sorted(book.addresses()) == ["alice@example.com", "bob@example.com"]
+
+
+def test_first_merge_scans_recent_sent_mail(book):
+    gmail = FakeGmail([sent('s1', "alice@example.com"), sent('s2', "Carol <carol@example.com>")])
+
+    book.merge_sent(gmail)
+
+    assert sorted(book.addresses()) == ["alice@example.com", "carol@example.com"]
+    assert book.history_id == "100"
+
+
+def test_later_merges_follow_history_and_skip_recorded_sends(book):
+    gmail = FakeGmail([sent('s1', "alice@example.com")])
+    book.merge_sent(gmail)
+    gmail.mail['s2'] = sent('s2', "alice@example.com")
+    gmail.mail['s3'] = sent('s3', "dave@example.com")
+    gmail.records = [{'messagesAdded': [{'message': {'id': 's2'}}, {'message': {'id': 's3'}}]}]
+    gmail.history_id = 101
+    book.record("alice@example.com", message_id='s2')
+
+    book.merge_sent(gmail)
+
+    assert book.get("alice@example.com")['count'] == 2
+    assert book.get("dave@example.com")['count'] == 1
+    assert book.history_id == "101"
+    assert book.recorded_ids == []
+
+
+def test_expired_history_rescans_sent_mail(book):
+    gmail = FakeGmail([sent('s1', "alice@example.com")])
+    book.merge_sent(gmail)
+    gmail.mail['s2'] = sent('s2', "erin@example.com")
+    gmail.history_expired = True
+
+    book.merge_sent(gmail)
+
+    assert book.get("erin@example.com")['count'] == 1
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+
+# bulk_reminders shares the reminder module's Calendar setup, which needs the speech libraries.
+pytest.importorskip("pyttsx3")
+pytest.importorskip("speech_recognition")
+
+from bulk_reminders import create_reminders, import_reminders, load_csv, validate  # noqa: E402
+from fakes import FakeCalendar  # noqa: E402
+from reminder_store import ReminderStore  # noqa: E402
+
+
+NOW = datetime(2026, 10, 18, 10, 0)
+
+
+def row(**columns):
+    return dict({"line": 2, "date": "20-10-2026", "time": "08:00", "note": "Take vitamin D"}, **columns)
+
+
+def test_load_csv_skips_blank_rows_and_keeps_line_numbers(tmp_path):
+    path = tmp_path / "reminders.csv"
+    path.write_text("Date,Time,Note\n20-10-2026,08:00,Vitamins\n,,\n21-10-2026,5:30 PM,Report\n")
+
+    rows = load_csv(str(path))
+
+    assert [(r["line"], r["note"]) for r in rows] == [(2, "Vitamins"), (4, "Report")]
+
+
+@pytest.mark.parametrize("columns, error", [
+    ({"note": ""}, "missing note"),
+    ({"date": "31-02-2026"}, "invalid date '31-02-2026'"),
+    ({"time": "25:00"}, "invalid time '25:00'"),
+    ({"date": "01-10-2026"}, "date is in the past"),
+    ({"count": "3"}, "count and until need a repeat"),
+    ({"repeat": "hourly"}, "unknown repeat 'hourly'"),
+    ({"repeat": "daily", "count": "3", "until": "30-10-2026"}, "use either count or until, not both"),
+    ({"date": "01-10-2026", "repeat": "daily", "count": "3"}, "the repetition ends in the past"),
+])
+def test_validate_rejects_bad_rows(columns, error):
+    assert validate(row(**columns), now=NOW) == (None, error)
+
+
+def test_validate_builds_the_recurrence():
+    reminder, error = validate(row(date="01-10-2026", time="5:30 pm", repeat="weekdays", until="31-12-2026"),
+                               now=NOW)
+
+    assert error is None
+    assert reminder["start"] == datetime(2026, 10, 1, 17, 30)
+    assert reminder["recurrence"] == ["RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR;UNTIL=20261231T235959Z"]
+
+
+def test_reminders_are_created_in_batches_and_stored(tmp_path):
+    calendar = FakeCalendar()
+    store = ReminderStore(str(tmp_path / "reminders.db"))
+    reminders = [validate(row(line=line, note=f"Note {line}"), now=NOW)[0] for line in range(2, 7)]
+
+    results = create_reminders(calendar, reminders, store=store, chunk_size=2)
+
+    assert [result["event_id"] for result in results] == ["e1", "e2", "e3", "e4", "e5"]
+    assert len(store.upcoming(now=0)) == 5
+
+
+def test_dry_run_only_validates():
+    results = import_reminders([row(date="20-10-2099"), row(line=3, note="")], dry_run=True)
+
+    assert [(result["ok"], result["error"]) for result in results] == [(True, None), (False, "missing note")]
@@ -0,0 +1,69 @@
+import intent_cache
+from intent_cache import IntentCache, normalize_command
+
+
+RESULT = {"intent": "open_application", "entities": {"app_name": "notepad"}}
+
+
+def test_normalize_command():
+    assert normalize_command("  Open   Notepad, please! ") == "open notepad please"
+
+
+def test_trivial_variations_share_an_entry():
+    cache = IntentCache("v1")
+    cache.put("Open notepad.", RESULT, latency=1.5)
+
+    assert cache.get("open   NOTEPAD") == RESULT
+    assert cache.stats()["saved_seconds"] == 1.5
+
+
+def test_results_are_copied():
+    cache = IntentCache("v1")
+    cache.put("open notepad", RESULT)
+
+    cache.get("open notepad")["entities"]["app_name"] = "paint"
+
+    assert cache.get("open notepad") == RESULT
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(intent_cache.time, "time", lambda: now[0])
+    cache = IntentCache("v1", ttl_seconds=60)
+    cache.put("open notepad", RESULT)
+
+    now[0] += 61
+
+    assert cache.get("open notepad") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = IntentCache("v1", max_entries=2)
+    cache.put("one", RESULT)
+    cache.put("two", RESULT)
+    cache.get("one")
+
+    cache.put("three", RESULT)
+
+    assert cache.get("two") is None
+    assert cache.get("one") == RESULT
+    assert cache.get("three") == RESULT
+
+
+def test_entries_survive_a_restart_for_the_same_version_only(tmp_path):
+    path = str(tmp_path / "intent_cache.json")
+    IntentCache("v1", path=path).put("open notepad", RESULT)
+
+    assert IntentCache("v1", path=path).get("open notepad") == RESULT
+    assert IntentCache("v2", path=path).get("open notepad") is None
+
+
+def test_stats_count_hits_and_misses():
+    cache = IntentCache("v1")
+    cache.put("open notepad", RESULT)
+    cache.get("open notepad")
+    cache.get("close notepad")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
@@ -0,0 +1,51 @@
+import json
+
+from intent_classifier import IntentClassifier, compact_examples
+
+
+EXAMPLES = [
+    {"command": "How many unread emails do I have?", "intent": "read_unread_emails", "entities": {}},
+    {"command": "Show me emails from Amazon", "intent": "read_unread_emails", "entities": {"sender_name": "Amazon"}},
+    {"command": "List my reminders", "intent": "list_reminders", "entities": {}},
+    {"command": "Delete my reminder", "intent": "delete_reminder", "entities": {}},
+]
+
+
+def test_paraphrase_is_classified_without_new_words():
+    prediction = IntentClassifier().fit(EXAMPLES).classify("how many unread emails do i have")
+    assert prediction["intent"] == "read_unread_emails"
+    assert prediction["new_words"] == []
+
+
+def test_entity_words_are_reported_as_new():
+    classifier = IntentClassifier().fit(EXAMPLES)
+    prediction = classifier.classify("how many unread emails from amazon do i have")
+    assert prediction is not None
+    assert "amazon" in prediction["new_words"]
+
+
+def test_duplicates_are_merged():
+    classifier = IntentClassifier().fit(EXAMPLES + [dict(EXAMPLES[2], intent="read_notifications")])
+    assert len(classifier.examples) == len(EXAMPLES)
+    assert classifier.examples[2]["intent"] == "read_notifications"
+    assert not classifier.add_example("list my reminders!", "read_notifications")
+    assert classifier.add_example("list my reminders", "list_reminders")
+    assert len(classifier.examples) == len(EXAMPLES)
+
+
+def test_added_examples_are_used_before_a_refit():
+    classifier = IntentClassifier().fit(EXAMPLES)
+    assert classifier.add_example("turn up the volume", "volume_up")
+    assert classifier.classify("turn up the volume")["intent"] == "volume_up"
+
+
+def test_compact_examples_rewrites_duplicates(tmp_path):
+    path = tmp_path / "examples.jsonl"
+    lines = [{"command": "open notepad", "intent": "open_application", "entities": {}}] * 3
+    lines.append({"command": "list reminders", "intent": "list_reminders", "entities": {}})
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+
+    examples = compact_examples(str(path))
+
+    assert [example["command"] for example in examples] == ["open notepad", "list reminders"]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
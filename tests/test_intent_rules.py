@@ -0,0 +1,35 @@
+import pytest
+
+from intent_rules import match_intent
+
+
+@pytest.mark.parametrize("command, intent, entities", [
+    ("open notepad", "open_application", {"app_name": "notepad"}),
+    ("Launch the Calculator app.", "open_application", {"app_name": "Calculator"}),
+    ("close chrome", "close_application", {"app_name": "chrome"}),
+    ("read my unread emails", "read_unread_emails", {}),
+    ("read emails from amazon", "read_unread_emails", {"sender_name": "amazon"}),
+    ("check new messages from noreply@google.com", "read_unread_emails", {"sender_email": "noreply@google.com"}),
+    ("how many unread emails do i have?", "read_unread_emails", {}),
+    ("mark all emails from amazon as read", "mark_emails_read", {"sender_name": "amazon"}),
+    ("archive all newsletters", "archive_newsletters", {}),
+    ("list my reminders", "list_reminders", {}),
+    ("read my notifications", "read_notifications", {}),
+    ("goodbye", "exit_assistant", {}),
+])
+def test_unambiguous_commands_match(command, intent, entities):
+    assert match_intent(command) == {"intent": intent, "entities": entities}
+
+
+@pytest.mark.parametrize("command", [
+    "",
+    "remind me to buy milk tomorrow at 5 pm",
+    "send an email to alice saying hello",
+    "what is the capital of france",
+    "open the pod bay doors and tell me a story",
+    "close it",
+    "open my email",
+    "close all windows",
+])
+def test_other_commands_defer_to_the_llm(command):
+    assert match_intent(command) is None
@@ -0,0 +1,37 @@
+import pytest
+
+from json_extract import JsonObjectExtractor, complete_partial_json, loads_lenient
+
+
+def test_extractor_stops_at_the_closing_brace():
+    extractor = JsonObjectExtractor()
+    assert extractor.feed('```json\n{"intent": "gree') is None
+    assert extractor.feed('ting", "entities": {"a": "}"}} and more') == '{"intent": "greeting", "entities": {"a": "}"}}'
+    assert extractor.done
+
+
+def test_loads_lenient_ignores_surrounding_prose():
+    assert loads_lenient('Sure! {"intent": "greeting", "entities": {}} Hope that helps.') == (
+        {"intent": "greeting", "entities": {}}, False)
+
+
+@pytest.mark.parametrize("text, expected", [
+    # A member cut off inside a string is dropped, never completed.
+    ('{"intent": "send_email", "entities": {"recipient": "Al', {"intent": "send_email"}),
+    ('{"intent": "x", "entities": {"recipient"', {"intent": "x"}),
+    ('{"a": 1, "b": 12', {"a": 1}),
+    # Only the closing brackets are missing.
+    ('{"intent": "send_email", "entities": {"recipient": "Al"', {"intent": "send_email", "entities": {"recipient": "Al"}}),
+])
+def test_complete_partial_json(text, expected):
+    assert complete_partial_json(text) == expected
+
+
+def test_half_written_intent_is_not_recovered():
+    assert loads_lenient('{"intent": "send_em') == (None, False)
+
+
+def test_loads_lenient_reports_repairs():
+    value, repaired = loads_lenient('{"intent": "greeting", "entities": {}')
+    assert value == {"intent": "greeting", "entities": {}}
+    assert repaired
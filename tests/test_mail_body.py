@@ -0,0 +1,52 @@
+import base64
+
+import pytest
+
+from mail_body import extract_body, extract_snippet
+
+
+def encode(text: str, charset: str = 'utf-8') -> str:
+    return base64.urlsafe_b64encode(text.encode(charset)).decode('ascii')
+
+
+def part(mime_type: str, text: str, charset: str = 'utf-8') -> dict:
+    return {
+        'mimeType': mime_type,
+        'headers': [{'name': 'Content-Type', 'value': f'{mime_type}; charset="{charset}"'}],
+        'body': {'data': encode(text, charset)},
+    }
+
+
+def message(payload: dict) -> dict:
+    return {'id': 'm1', 'payload': payload}
+
+
+@pytest.mark.parametrize("html, expected", [
+    ("<p>Hello <b>world</b> today, see <a href='#'>this link</a> now</p>", "Hello world today, see this link now"),
+    ("<b>one</b> <i>two</i>", "one two"),
+    ("<p>Price:<span> 5</span></p>", "Price: 5"),
+    ("<style>p {color: red}</style><p>Visible</p><script>alert(1)</script>", "Visible"),
+])
+def test_html_text_keeps_word_breaks(html, expected):
+    assert extract_body(message(part('text/html', html))).strip() == expected
+
+
+def test_plain_text_is_preferred_over_html():
+    payload = {
+        'mimeType': 'multipart/alternative',
+        'parts': [part('text/plain', "Plain version"), part('text/html', "<p>HTML version</p>")],
+    }
+    assert extract_body(message(payload)).strip() == "Plain version"
+
+
+def test_declared_charset_is_used():
+    assert extract_body(message(part('text/plain', "Grüße", charset='iso-8859-1'))).strip() == "Grüße"
+
+
+def test_snippet_is_the_first_non_blank_line():
+    body = "\n\n  First line here  \nSecond line"
+    assert extract_snippet(message(part('text/plain', body))) == "First line here"
+
+
+def test_snippet_is_cut_to_length():
+    assert extract_snippet(message(part('text/plain', "x" * 50)), length=10) == "x" * 10 + "..."
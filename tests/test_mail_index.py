@@ -0,0 +1,99 @@
+import pytest
+
+from fakes import FakeGmail
+from mail_index import MailIndex
+
+
+def message(message_id, sender, labels=('UNREAD', 'INBOX'), date=0):
+    return {'id': message_id, 'from': sender, 'subject': f"Subject {message_id}", 'labelIds': list(labels),
+            'date': date}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return MailIndex(str(tmp_path / "mail_index.db"))
+
+
+@pytest.fixture
+def gmail():
+    return FakeGmail([
+        message('m1', "Amazon <orders@amazon.com>", date=1),
+        message('m2', "Alice <alice@example.com>", date=2),
+        message('m3', "Bob <bob@example.com>", labels=('INBOX',), date=3),
+    ])
+
+
+def test_full_sync_loads_unread_mail_and_history_id(index, gmail):
+    index.full_sync(gmail)
+
+    assert index.is_ready()
+    assert index.history_id == "100"
+    assert [row['id'] for row in index.unread_messages()] == ['m2', 'm1']
+    assert index.unread_total() == 2
+
+
+def test_full_sync_replaces_previous_contents(index, gmail):
+    index.full_sync(gmail)
+    del gmail.mail['m1']
+    index.full_sync(gmail)
+
+    assert [row['id'] for row in index.unread_messages()] == ['m2']
+
+
+def test_unread_messages_filters_by_sender(index, gmail):
+    index.full_sync(gmail)
+
+    assert [row['id'] for row in index.unread_messages(sender_filter="amazon")] == ['m1']
+
+
+def test_sync_without_history_id_does_a_full_sync(index, gmail):
+    index.sync(gmail)
+
+    assert index.history_id == "100"
+    assert ('history', "100") not in gmail.calls
+
+
+def test_sync_applies_history_changes(index, gmail):
+    index.full_sync(gmail)
+    gmail.mail['m4'] = message('m4', "Carol <carol@example.com>", date=4)
+    gmail.history_id = 105
+    gmail.records = [
+        {'messagesAdded': [{'message': {'id': 'm4'}}]},
+        {'labelsRemoved': [{'message': {'id': 'm1', 'labelIds': ['INBOX']}, 'labelIds': ['UNREAD']}]},
+        {'messagesDeleted': [{'message': {'id': 'm2'}}]},
+    ]
+
+    index.sync(gmail)
+
+    assert index.history_id == "105"
+    assert [row['id'] for row in index.unread_messages()] == ['m4']
+
+
+def test_sync_fetches_messages_that_become_unread(index, gmail):
+    index.full_sync(gmail)
+    gmail.mail['m3']['labelIds'].append('UNREAD')
+    gmail.records = [{'labelsAdded': [{'message': {'id': 'm3', 'labelIds': ['INBOX', 'UNREAD']}}]}]
+
+    index.sync(gmail)
+
+    assert {row['id'] for row in index.unread_messages()} == {'m1', 'm2', 'm3'}
+
+
+def test_sync_starts_over_when_history_has_expired(index, gmail):
+    index.full_sync(gmail)
+    gmail.mail['m5'] = message('m5', "Dave <dave@example.com>", date=5)
+    gmail.history_id = 200
+    gmail.history_expired = True
+
+    index.sync(gmail)
+
+    assert index.history_id == "200"
+    assert [row['id'] for row in index.unread_messages()] == ['m5', 'm2', 'm1']
+
+
+def test_remove_label_from_applies_local_changes(index, gmail):
+    index.full_sync(gmail)
+
+    index.remove_label_from(['m1', 'm2'], 'UNREAD')
+
+    assert index.unread_messages() == []
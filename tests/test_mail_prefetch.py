@@ -0,0 +1,88 @@
+from fakes import FakeGmail
+from gmail_utils import batch_get_messages, get_header
+from mail_prefetch import UnreadPrefetcher
+
+
+def message(message_id, sender, labels=('UNREAD', 'INBOX')):
+    return {'id': message_id, 'from': sender, 'subject': f"Subject {message_id}", 'labelIds': list(labels)}
+
+
+def unread_headers(service, limit):
+    listed = service.users().messages().list(userId='me', q='is:unread', maxResults=limit).execute()
+    metadata = batch_get_messages(service, [item['id'] for item in listed['messages']])
+    return [{'id': message_id, 'sender': get_header(metadata[message_id], 'From'),
+             'subject': get_header(metadata[message_id], 'Subject')} for message_id in metadata]
+
+
+def unread_total(service):
+    return sum('UNREAD' in message['labelIds'] for message in service.mail.values())
+
+
+def prefetcher(gmail, limit=50):
+    return UnreadPrefetcher(lambda: gmail, unread_headers, unread_total, limit=limit)
+
+
+GMAIL_MESSAGES = [
+    message('m1', "Alice <alice@example.com>"),
+    message('m2', "Amazon <orders@amazon.com>"),
+    message('m3', "Alice <alice@example.com>"),
+    message('m4', "Bob <bob@example.com>", labels=('INBOX',)),
+]
+
+
+def test_filtered_read_is_served_from_the_prefetch():
+    gmail = FakeGmail(GMAIL_MESSAGES)
+    unread = prefetcher(gmail)
+    unread.sync(gmail)
+    calls = len(gmail.calls)
+
+    messages = unread.unread_messages("alice", limit=5)
+
+    assert [message['id'] for message in messages] == ['m1', 'm3']
+    assert unread.body('m1')['id'] == 'm1'
+    assert len(gmail.calls) == calls
+
+
+def test_latest_message_of_each_sender_is_prefetched_once():
+    gmail = FakeGmail(GMAIL_MESSAGES)
+    unread = prefetcher(gmail)
+    unread.sync(gmail)
+
+    assert unread.body('m1') and unread.body('m2')
+    assert unread.body('m3') is None
+    assert gmail.calls.count(('get', 'm1')) == 2  # headers and body
+
+    unread.sync(gmail)
+
+    assert gmail.calls.count(('get', 'm1')) == 3  # headers only; the body is still cached
+
+
+def test_filtered_read_is_not_answered_from_a_partial_list():
+    gmail = FakeGmail(GMAIL_MESSAGES)
+    unread = prefetcher(gmail, limit=2)
+    unread.sync(gmail)
+
+    assert unread.unread_messages("alice") is None
+    assert [message['id'] for message in unread.unread_messages()] == ['m1', 'm2']
+    assert unread.unread_counts() is None
+
+
+def test_counts_come_from_the_prefetch():
+    gmail = FakeGmail(GMAIL_MESSAGES)
+    unread = prefetcher(gmail)
+    unread.sync(gmail)
+
+    assert unread.unread_total() == 3
+    assert unread.unread_counts() == {'alice@example.com': 2, 'orders@amazon.com': 1}
+
+
+def test_forgotten_messages_leave_the_list_count_and_bodies():
+    gmail = FakeGmail(GMAIL_MESSAGES)
+    unread = prefetcher(gmail)
+    unread.sync(gmail)
+
+    unread.forget(['m1'])
+
+    assert [message['id'] for message in unread.unread_messages("alice")] == ['m3']
+    assert unread.unread_total() == 2
+    assert unread.body('m1') is None
@@ -0,0 +1,58 @@
+import json
+
+from ollama_client import OllamaClient
+
+
+class FakeStreamResponse:
+    def __init__(self, chunks):
+        self.lines = [json.dumps(chunk).encode() for chunk in chunks]
+        self.closed = False
+
+    def iter_lines(self):
+        yield from self.lines
+
+    def close(self):
+        self.closed = True
+
+
+def client_streaming(chunks):
+    client = OllamaClient()
+    response = FakeStreamResponse(chunks)
+    client.post = lambda path, payload, stream=False: response
+    return client, response
+
+
+CHUNKS = [
+    {"response": "{", "done": False},
+    {"response": "}", "done": False},
+    {"response": "", "done": True, "total_duration": 3_000_000_000, "load_duration": 2_500_000_000,
+     "prompt_eval_duration": 300_000_000, "eval_duration": 200_000_000, "prompt_eval_count": 10, "eval_count": 2},
+]
+
+
+def test_finished_stream_records_ollama_timings():
+    client, response = client_streaming(CHUNKS)
+
+    assert len(list(client.stream_generate({"model": "m"}))) == 3
+
+    summary = client.metrics.summary()
+    assert summary["requests"] == 1
+    assert summary["closed_early"] == 0
+    assert summary["cold_loads"] == 1
+    assert summary["avg_load_duration_ms"] == 2500.0
+    assert response.closed
+
+
+def test_stream_closed_early_is_still_counted():
+    client, response = client_streaming(CHUNKS)
+
+    stream = client.stream_generate({"model": "m"})
+    next(stream)
+    stream.close()
+
+    summary = client.metrics.summary()
+    assert summary["requests"] == 1
+    assert summary["closed_early"] == 1
+    assert summary["avg_load_duration_ms"] == 0
+    assert summary["avg_first_chunk_ms"] >= 0
+    assert response.closed
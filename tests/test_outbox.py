@@ -0,0 +1,128 @@
+from email.mime.text import MIMEText
+
+import pytest
+from googleapiclient.errors import HttpError
+
+import outbox as outbox_module
+from fakes import FakeRequest, FakeResponse
+from outbox import Outbox
+
+
+class FakeSendService:
+    """Gmail send and the Sent folder search used by Outbox; errors are raised by the next sends in turn."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []  # raw messages that went out
+        self.in_sent_folder = {}  # Message-ID -> sent message id
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def send(self, userId, body):
+        def run():
+            if self.errors:
+                raise self.errors.pop(0)
+            self.sent.append(body['raw'])
+            return {'id': f"sent{len(self.sent)}"}
+        return FakeRequest(run)
+
+    def list(self, userId, q, maxResults):
+        key = q.split()[0].split(':', 1)[1]
+        sent_id = self.in_sent_folder.get(key)
+        return FakeRequest(lambda: {'messages': [{'id': sent_id}]} if sent_id else {})
+
+
+def message(message_id="<m1@example.com>"):
+    mime = MIMEText("Hello")
+    mime['To'] = "alice@example.com"
+    mime['Subject'] = "Hi"
+    mime['Message-ID'] = message_id
+    return mime
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(str(tmp_path / "outbox.db"))
+
+
+def results(outbox):
+    seen = []
+    outbox.add_listener(lambda entry, error: seen.append((entry['key'], entry.get('sent_id'), error)))
+    return seen
+
+
+def test_enqueueing_the_same_message_twice_stores_it_once(outbox):
+    assert outbox.enqueue(message()) == outbox.enqueue(message())
+    assert len(outbox.pending()) == 1
+
+
+def test_message_without_a_message_id_gets_one(outbox):
+    mime = message()
+    del mime['Message-ID']
+
+    key = outbox.enqueue(mime)
+
+    assert key and outbox.pending()[0]['key'] == key
+
+
+def test_due_message_is_sent_and_reported(outbox):
+    seen = results(outbox)
+    service = FakeSendService()
+    outbox.enqueue(message())
+
+    outbox._send(service, outbox._next_due())
+
+    assert seen == [("<m1@example.com>", "sent1", None)]
+    assert outbox.pending() == []
+
+
+def test_transient_error_is_retried_after_a_backoff(outbox):
+    service = FakeSendService(errors=[HttpError(FakeResponse(503), b'unavailable')])
+    outbox.enqueue(message())
+
+    outbox._send(service, outbox._next_due())
+
+    entry = outbox.pending()[0]
+    assert (entry['status'], entry['attempts']) == ('pending', 1)
+    assert entry['next_attempt'] > 0
+    assert outbox._next_due() is None  # not due until the backoff has passed
+
+
+def test_permanent_error_is_reported_without_a_retry(outbox):
+    seen = results(outbox)
+    service = FakeSendService(errors=[HttpError(FakeResponse(400), b'bad request')])
+    outbox.enqueue(message())
+
+    outbox._send(service, outbox._next_due())
+
+    assert outbox.pending() == []
+    assert seen[0][2]
+
+
+def test_retry_does_not_resend_a_message_that_got_through(outbox, monkeypatch):
+    seen = results(outbox)
+    service = FakeSendService(errors=[ConnectionError("response lost")])
+    outbox.enqueue(message())
+    outbox._send(service, outbox._next_due())
+    # The first send reached Gmail even though its response was lost.
+    service.in_sent_folder["<m1@example.com>"] = "earlier"
+    monkeypatch.setattr(outbox_module.time, "time", lambda: 10 ** 12)
+
+    outbox._send(service, outbox._next_due())
+
+    assert service.sent == []
+    assert seen == [("<m1@example.com>", "earlier", None)]
+
+
+def test_interrupted_send_is_picked_up_again_after_a_restart(outbox):
+    outbox.enqueue(message())
+    outbox._next_due()  # marked as sending when the assistant stopped
+
+    restarted = Outbox(outbox.path)
+
+    entry = restarted.pending()[0]
+    assert (entry['status'], entry['attempts']) == ('pending', 1)
@@ -0,0 +1,51 @@
+from recipient_index import RecipientIndex, name_parts
+
+
+ADDRESSES = ["jane.doe@gmail.com", "jane@work.com", "john.smith@example.com", "bob_jones99@example.org",
+             "alice@example.com", "carol.white@example.net"]
+
+
+def index(usage=None):
+    recipients = RecipientIndex(usage=usage)
+    recipients.add_all(ADDRESSES)
+    return recipients
+
+
+def test_name_parts():
+    assert name_parts("jane.doe_99@x.com") == ["jane", "doe"]
+    assert name_parts("alice@example.com") == ["alice"]
+
+
+def test_spoken_name_matches_the_whole_local_part_first():
+    assert index().search("jane")[:2] == [("jane@work.com", 0), ("jane.doe@gmail.com", 0)]
+
+
+def test_spoken_name_matches_a_name_part():
+    assert index().search("doe") == [("jane.doe@gmail.com", 0)]
+    assert index().search("jones")[0] == ("bob_jones99@example.org", 0)
+
+
+def test_misheard_name_is_within_the_edit_threshold():
+    assert index().search("alise")[0] == ("alice@example.com", 1)
+
+
+def test_full_address_is_compared_as_a_whole():
+    assert index().search("alice@example.com") == [("alice@example.com", 0)]
+
+
+def test_unrelated_query_finds_nothing():
+    assert index().search("zebedee") == []
+
+
+def test_ties_go_to_the_most_used_address():
+    usage = {"carol.white@work.com": {"count": 5, "last_used": 1.0}}
+    recipients = index(usage=usage.get)
+    recipients.add("carol.white@work.com")
+    assert [address for address, _ in recipients.search("carol white")] == [
+        "carol.white@work.com", "carol.white@example.net"]
+
+
+def test_addresses_are_added_once_case_insensitively():
+    recipients = index()
+    recipients.add("Alice@Example.com")
+    assert len(recipients) == len(ADDRESSES)
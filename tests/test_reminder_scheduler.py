@@ -0,0 +1,63 @@
+import threading
+import time
+
+import pytest
+
+from reminder_scheduler import ReminderScheduler
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "reminder_schedule.db")
+
+
+def test_next_due_is_the_earliest_live_reminder(path):
+    scheduler = ReminderScheduler(path)
+    scheduler.schedule("a", "Dentist", 300.0)
+    scheduler.schedule("b", "Gym", 200.0)
+    scheduler.schedule("b", "Gym", 400.0)  # moved
+    assert scheduler.next_due() == 300.0
+
+    scheduler.cancel("a")
+
+    assert scheduler.next_due() == 400.0
+    assert scheduler.due_time("a") is None
+    assert len(scheduler) == 1
+
+
+def test_due_reminders_pop_in_order(path):
+    scheduler = ReminderScheduler(path)
+    scheduler.schedule("a", "Dentist", 20.0)
+    scheduler.schedule("b", "Gym", 10.0)
+    scheduler.schedule("c", "Later", 99.0)
+
+    assert scheduler._pop_due(now=50.0) == [("b", "Gym", 10.0), ("a", "Dentist", 20.0)]
+    assert len(scheduler) == 1
+
+
+def test_schedule_survives_a_restart(path):
+    ReminderScheduler(path).schedule("a", "Dentist", 300.0)
+
+    assert ReminderScheduler(path).due_time("a") == 300.0
+
+
+def test_late_reminders_are_flagged_missed_and_old_ones_dropped(path):
+    fired = []
+    scheduler = ReminderScheduler(path, on_due=lambda *args: fired.append(args), missed_grace=3600)
+
+    scheduler._fire("a", "On time", 1000.0, now=1010.0)
+    scheduler._fire("b", "Late", 1000.0, now=2000.0)
+    scheduler._fire("c", "Too late", 1000.0, now=9000.0)
+
+    assert fired == [("a", "On time", 1000.0, False), ("b", "Late", 1000.0, True)]
+
+
+def test_scheduler_thread_fires_a_reminder_when_it_comes_due(path):
+    fired = threading.Event()
+    scheduler = ReminderScheduler(path, on_due=lambda *args: fired.set())
+    scheduler.start()
+    try:
+        scheduler.schedule("a", "Soon", time.time() + 0.1)
+        assert fired.wait(2)
+    finally:
+        scheduler.stop()
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from fakes import FakeCalendar
+from reminder_store import ReminderStore, event_start
+from time_parser import TimeParser
+
+
+KOLKATA = TimeParser('Asia/Kolkata').tzinfo
+
+
+def test_timed_event_keeps_its_offset():
+    start = event_start({'start': {'dateTime': "2026-10-20T09:00:00+05:30"}}, KOLKATA)
+
+    assert start == datetime(2026, 10, 20, 3, 30, tzinfo=timezone.utc)
+
+
+def test_all_day_event_starts_at_midnight_in_the_configured_zone():
+    start = event_start({'start': {'date': "2026-10-20"}}, KOLKATA)
+
+    assert start == datetime(2026, 10, 19, 18, 30, tzinfo=timezone.utc)
+
+
+def test_event_without_a_start_has_none():
+    assert event_start({}) is None
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReminderStore(str(tmp_path / "reminders.db"), tz=KOLKATA)
+
+
+def event(summary, start="2099-01-01T09:00:00+05:30"):
+    return {'summary': summary, 'start': {'dateTime': start}, 'end': {'dateTime': start}}
+
+
+def changes_of(store):
+    seen = []
+    store.add_listener(lambda event_id, row: seen.append((event_id, row and row['summary'])))
+    return seen
+
+
+def test_first_sync_loads_events_and_keeps_the_sync_token(store):
+    calendar = FakeCalendar()
+    calendar.insert('primary', event("Dentist")).execute()
+
+    store.sync(calendar)
+
+    assert store.is_ready()
+    assert [row['summary'] for row in store.upcoming()] == ["Dentist"]
+
+
+def test_later_syncs_apply_only_the_changes(store):
+    calendar = FakeCalendar()
+    dentist = calendar.insert('primary', event("Dentist")).execute()
+    store.sync(calendar)
+    seen = changes_of(store)
+    calendar.insert('primary', event("Gym", "2099-01-02T07:00:00+05:30")).execute()
+    calendar.delete('primary', dentist['id']).execute()
+
+    store.sync(calendar)
+
+    assert calendar.calls[-1] == ('list', "1")
+    assert seen == [("e2", "Gym"), (dentist['id'], None)]
+    assert [row['summary'] for row in store.upcoming()] == ["Gym"]
+
+
+def test_expired_sync_token_starts_over(store):
+    calendar = FakeCalendar()
+    calendar.insert('primary', event("Dentist")).execute()
+    store.sync(calendar)
+    calendar.items.clear()
+    calendar.insert('primary', event("Gym")).execute()
+    calendar.token_expired = True
+    seen = changes_of(store)
+
+    store.sync(calendar)
+
+    assert [row['summary'] for row in store.upcoming()] == ["Gym"]
+    assert ("e1", None) in seen
+    assert store.sync_token == "2"
+
+
+def test_upcoming_skips_past_events(store):
+    store.upsert(dict(event("Yesterday", "2000-01-01T09:00:00+05:30"), id="old"))
+    store.upsert(dict(event("Later"), id="new"))
+
+    assert [row['id'] for row in store.upcoming()] == ["new"]
@@ -0,0 +1,102 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from time_parser import TimeParser
+
+
+NOW = datetime(2026, 10, 18, 10, 0)  # a Sunday
+
+
+@pytest.fixture
+def parser():
+    return TimeParser()
+
+
+@pytest.mark.parametrize("date_text, time_text, expected", [
+    ("tomorrow", "5 PM", datetime(2026, 10, 19, 17, 0)),
+    ("tomorrow at 5 pm", None, datetime(2026, 10, 19, 17, 0)),
+    (None, "5 pm", datetime(2026, 10, 18, 17, 0)),
+    (None, "9 am", datetime(2026, 10, 19, 9, 0)),
+    ("next friday", "half past five pm", datetime(2026, 10, 23, 17, 30)),
+    ("25th of August", "17:30", datetime(2027, 8, 25, 17, 30)),
+    ("sixteen may twenty twenty seven", "fifteen thirty", datetime(2027, 5, 16, 15, 30)),
+    ("25-08-2027", "5:30 PM", datetime(2027, 8, 25, 17, 30)),
+    ("the 5th", "3 pm", datetime(2026, 11, 5, 15, 0)),
+    ("the twenty fifth", "10 am", datetime(2026, 10, 25, 10, 0)),
+    ("5/11", "3 pm", datetime(2026, 11, 5, 15, 0)),
+    ("this evening", None, datetime(2026, 10, 18, 18, 0)),
+    (None, "in an hour and a half", datetime(2026, 10, 18, 11, 30)),
+    ("tonight", "9", datetime(2026, 10, 18, 21, 0)),
+    ("tomorrow evening", "7", datetime(2026, 10, 19, 19, 0)),
+    ("tomorrow morning", "7 pm", datetime(2026, 10, 19, 19, 0)),
+    ("next week", "monday 9 am", datetime(2026, 10, 19, 9, 0)),
+    ("next week friday", "5 pm", datetime(2026, 10, 23, 17, 0)),
+    ("tomorrow", "nine o five", datetime(2026, 10, 19, 9, 5)),
+])
+def test_parse(parser, date_text, time_text, expected):
+    assert parser.parse(date_text, time_text, now=NOW) == expected
+
+
+@pytest.mark.parametrize("date_text, time_text", [
+    ("next month", "3 pm"),
+    ("sometime soon", "3 pm"),
+    ("17/30", "5 pm"),
+    ("tomorrow", None),
+    (None, None),
+    ("today", "9 am"),
+    ("tonight", "9 am"),
+    ("25-08-2025", "5 pm"),
+])
+def test_parse_rejects_what_it_cannot_read(parser, date_text, time_text):
+    assert parser.parse(date_text, time_text, now=NOW) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("today", date(2026, 10, 18)),
+    ("day after tomorrow", date(2026, 10, 20)),
+    ("in 3 days", date(2026, 10, 21)),
+    ("sunday", date(2026, 10, 25)),
+    ("this sunday", date(2026, 10, 18)),
+    ("2026-12-01", date(2026, 12, 1)),
+    ("the 31st", date(2026, 10, 31)),
+    ("the 18th", date(2026, 10, 18)),
+    ("the 17th", date(2026, 11, 17)),
+    ("next week", date(2026, 10, 25)),
+    ("wednesday next week", date(2026, 10, 21)),
+])
+def test_parse_date(parser, text, expected):
+    assert parser.parse_date(text, now=NOW) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("5 pm", (17, 0)),
+    ("5:30 p.m.", (17, 30)),
+    ("17:30", (17, 30)),
+    ("quarter to six in the evening", (17, 45)),
+    ("noon", (12, 0)),
+    ("midnight", (0, 0)),
+    ("seven in the morning", (7, 0)),
+    ("1830 hours", (18, 30)),
+    ("five oh five pm", (17, 5)),
+    ("nine o five", (9, 5)),
+    ("nine o'clock", (9, 0)),
+])
+def test_parse_time(parser, text, expected):
+    assert parser.parse_time(text) == expected
+
+
+def test_next_week_weekday_is_in_the_following_week(parser):
+    wednesday = datetime(2026, 10, 21, 10, 0)
+    assert parser.parse_date("next week monday", now=wednesday) == date(2026, 10, 26)
+    assert parser.parse_date("next week sunday", now=wednesday) == date(2026, 11, 1)
+
+
+def test_part_of_day_from_elsewhere_does_not_override_am_pm(parser):
+    assert parser.parse_time("9", part="tonight") == (21, 0)
+    assert parser.parse_time("9 am", part="tonight") == (9, 0)
+
+
+def test_from_timestamp_uses_the_configured_timezone(parser):
+    assert parser.from_timestamp(datetime(2026, 10, 18, 4, 30, tzinfo=timezone.utc).timestamp()) == \
+        datetime(2026, 10, 18, 10, 0)
@@ -0,0 +1,341 @@
+import re
+from datetime import date, datetime, timedelta
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+    ZoneInfoNotFoundError = Exception
+
+
+DEFAULT_TIMEZONE = 'Asia/Kolkata'
+# Hours used when only a part of the day is given ("tomorrow morning").
+PART_OF_DAY_HOURS = {"morning": 9, "afternoon": 14, "evening": 18, "night": 21, "tonight": 21}
+
+_UNITS = {
+    "zero": 0, "oh": 0, "o": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50}
+_ORDINAL_UNITS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7, "eighth": 8,
+    "ninth": 9, "tenth": 10, "eleventh": 11, "twelfth": 12, "thirteenth": 13, "fourteenth": 14, "fifteenth": 15,
+    "sixteenth": 16, "seventeenth": 17, "eighteenth": 18, "nineteenth": 19,
+}
+_ORDINAL_TENS = {"twentieth": 20, "thirtieth": 30}
+_MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7, "august": 8,
+    "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10,
+    "nov": 11, "dec": 12,
+}
+_WEEKDAYS = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, "friday": 4, "saturday": 5, "sunday": 6}
+
+_MONTH = r"(?P<month>" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\.?"
+_WEEKDAY = r"(?P<weekday>" + "|".join(_WEEKDAYS) + r")"
+_AMOUNT = r"(?P<amount>\d+|an?)"
+
+_RELATIVE_TIME = re.compile(r"\bin\s+" + _AMOUNT + r"(?P<half_before>\s+and\s+a\s+half)?\s+(?P<unit>minute|min|hour|hr)s?\b"
+                            r"(?P<half_after>\s+and\s+a\s+half)?")
+_RELATIVE_DAYS = re.compile(r"\b(?:in\s+" + _AMOUNT + r"\s+(?P<unit>day|week)s?|"
+                            r"(?P<amount2>\d+|an?)\s+(?P<unit2>day|week)s?\s+from\s+(?:now|today))\b")
+_DAY_WORDS = re.compile(r"\b(?P<word>day\s+after\s+tomorrow|tomorrow|today|tonight|next\s+week)\b")
+_WEEKDAY_PATTERN = re.compile(r"\b(?:(?P<modifier>next|this|coming)\s+)?" + _WEEKDAY + r"\b")
+_ISO_DATE = re.compile(r"\b(?P<year>\d{4})[-/.](?P<month>\d{1,2})[-/.](?P<day>\d{1,2})\b")
+_NUMERIC_DATE = re.compile(r"\b(?P<day>\d{1,2})[-/.](?P<month>\d{1,2})[-/.](?P<year>\d{2,4})\b")
+_DAY_MONTH = re.compile(r"\b(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?" + _MONTH + r"(?:,?\s+(?P<year>\d{4}))?\b")
+_MONTH_DAY = re.compile(r"\b" + _MONTH + r"\s+(?:the\s+)?(?P<day>\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(?P<year>\d{4}))?\b")
+# "5/11" without a year; only with a slash, since "5.11" and "5-11" are also said for times and ranges.
+_DAY_SLASH_MONTH = re.compile(r"\b(?P<day>\d{1,2})/(?P<month>\d{1,2})\b(?!/\d)")
+# A day of the month on its own: "the 5th", "on the 25", "5th".
+_DAY_ONLY = re.compile(r"\b(?:the\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?|(?P<day2>\d{1,2})(?:st|nd|rd|th))\b"
+                       r"(?!\s*(?:[:.]\d|a\.?\s?m\b|p\.?\s?m\b|o'?\s?clock|minutes?\b|hours?\b))")
+_YEAR_PAIR = re.compile(r"\b(?P<century>19|20)\s+(?P<rest>\d{2})\b(?!\s*\d)")
+
+_NOON = re.compile(r"\b(?P<word>noon|midday|midnight)\b")
+_PAST_TO = re.compile(r"\b(?:(?P<minutes>\d{1,2})\s+(?:minutes?\s+)?|(?P<fraction>half|quarter)\s+)"
+                      r"(?P<direction>past|after|to|before)\s+(?P<hour>\d{1,2})\b")
+_CLOCK = re.compile(r"\b(?P<hour>\d{1,2})(?:(?::|\.|\s+)(?P<minute>\d{2})|\s+0\s+(?P<minute_digit>\d))?"
+                    r"\s*(?P<meridiem>a\.?\s?m\.?|p\.?\s?m\.?|o'?\s?clock)?(?!\s*[-/]\d)"
+                    r"(?:\s+(?:in\s+the\s+|at\s+)?(?P<part>morning|afternoon|evening|night))?")
+_MILITARY = re.compile(r"\b(?P<hour>[01]\d|2[0-3])(?P<minute>[0-5]\d)\s*(?:hours|hrs)?\b")
+_PART_OF_DAY = re.compile(r"\b(?P<part>morning|afternoon|evening|tonight|night)\b")
+# Words that may accompany a time without naming a date ("at 5 pm", "this evening").
+_TIME_FILLER = {"at", "on", "by", "in", "the", "this", "around", "about", "sharp"}
+
+_NUMBER_WORD = "|".join(sorted(
+    [word for word in _UNITS if word not in ("oh", "o")] + list(_TENS) + list(_ORDINAL_UNITS) + list(_ORDINAL_TENS)
+    + ["hundred", "thousand"], key=len, reverse=True))
+# "oh" and "o" only count as zero inside a number ("five oh five", "nine o five", but not "nine o'clock");
+# "and" only inside one ("two thousand and five").
+_NUMBER_RUN = re.compile(r"\b(?:" + _NUMBER_WORD + r")(?:\s+(?:and\s+)?(?:" + _NUMBER_WORD + r"|oh|o(?!'|\s+clock))\b)*\b")
+
+
+def _convert_number_run(run: str) -> str:
+    """Digits for a run of number words; consecutive numbers stay separate ("five thirty" -> "5 30")."""
+    output = []
+    value = None
+    state = None  # 'unit', 'tens' (a unit may follow) or 'big' (after hundred/thousand)
+
+    def flush():
+        nonlocal value, state
+        if value is not None:
+            output.append(str(value))
+        value = None
+        state = None
+
+    for word in run.split():
+        if word == "and":
+            continue
+        if word in ("hundred", "thousand"):
+            value = (value or 1) * (100 if word == "hundred" else 1000)
+            state = 'big'
+        elif word in _TENS or word in _ORDINAL_TENS:
+            if value is not None and state != 'big':
+                flush()
+            value = (value or 0) + _TENS.get(word, _ORDINAL_TENS.get(word))
+            state = 'tens'
+            if word in _ORDINAL_TENS:
+                flush()
+        else:
+            unit = _UNITS.get(word, _ORDINAL_UNITS.get(word))
+            if value is not None and (state == 'tens' and unit < 10 or state == 'big'):
+                value += unit
+            else:
+                flush()
+                value = unit
+            state = 'unit'
+            if word in _ORDINAL_UNITS:
+                flush()
+    flush()
+    return " ".join(output)
+
+
+def _words_to_numbers(text: str) -> str:
+    """
+    Replace spoken numbers with digits: "twenty fifth" -> "25", "five thirty" -> "5 30",
+    "twenty twenty five" -> "20 25", "two thousand twenty five" -> "2025". Other text is left as it is.
+    """
+    return _NUMBER_RUN.sub(lambda match: _convert_number_run(match.group(0)), text.lower())
+
+
+def _amount(value: str) -> int:
+    return 1 if value in ("a", "an") else int(value)
+
+
+def _hour_24(hour: int, meridiem: str | None, part: str | None) -> int | None:
+    meridiem = (meridiem or "").replace(".", "").replace(" ", "").replace("'", "")
+    if meridiem in ("am", "pm"):
+        if not 1 <= hour <= 12:
+            return None
+        return hour % 12 + (12 if meridiem == "pm" else 0)
+    if part in ("afternoon", "evening", "night", "tonight") and 1 <= hour <= 11:
+        return hour + 12
+    if part == "morning" and hour == 12:
+        return 0
+    return hour if 0 <= hour <= 23 else None
+
+
+class TimeParser:
+    """
+    Rule-based parser for the dates and times people say when setting reminders: relative days ("tomorrow",
+    "in 3 days", "next friday"), absolute dates ("25th of August", "25-08-2025"), 12 and 24 hour times
+    ("5 PM", "17:30", "half past five") and spoken numbers. Results are naive datetimes in the configured
+    timezone. All patterns are compiled once at import.
+    """
+
+    def __init__(self, timezone: str = DEFAULT_TIMEZONE):
+        self.timezone = timezone
+        self._tz = None
+        if ZoneInfo is not None and timezone:
+            try:
+                self._tz = ZoneInfo(timezone)
+            except (ZoneInfoNotFoundError, ValueError):
+                print(f"Unknown timezone '{timezone}', using the system's local time.")
+
+    @property
+    def tzinfo(self):
+        """The configured zone, or None when falling back to the system's local time."""
+        return self._tz
+
+    def now(self) -> datetime:
+        if self._tz is None:
+            return datetime.now()
+        return datetime.now(self._tz).replace(tzinfo=None)
+
+    def from_timestamp(self, timestamp: float) -> datetime:
+        """A Unix timestamp as a naive datetime in the configured timezone."""
+        if self._tz is None:
+            return datetime.fromtimestamp(timestamp)
+        return datetime.fromtimestamp(timestamp, self._tz).replace(tzinfo=None)
+
+    def normalize(self, text: str) -> str:
+        text = _words_to_numbers(text or "")
+        return " ".join(text.replace(",", " ").split())
+
+    def parse_date(self, text: str, now: datetime = None) -> date | None:
+        """The calendar date in the text, or None."""
+        now = now or self.now()
+        text = self.normalize(text)
+        today = now.date()
+
+        match = _RELATIVE_DAYS.search(text)
+        if match:
+            amount = _amount(match.group("amount") or match.group("amount2"))
+            unit = match.group("unit") or match.group("unit2")
+            return today + timedelta(days=amount * (7 if unit == "week" else 1))
+
+        match = _DAY_WORDS.search(text)
+        if match:
+            word = " ".join(match.group("word").split())
+            weekday = _WEEKDAY_PATTERN.search(text)
+            if word == "next week" and weekday:
+                # That day within next week, weeks starting on Monday.
+                return today + timedelta(days=7 - today.weekday() + _WEEKDAYS[weekday.group("weekday")])
+            offsets = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2, "next week": 7}
+            return today + timedelta(days=offsets[word])
+
+        match = _WEEKDAY_PATTERN.search(text)
+        if match:
+            days_ahead = (_WEEKDAYS[match.group("weekday")] - today.weekday()) % 7
+            if days_ahead == 0 and match.group("modifier") != "this":
+                days_ahead = 7
+            return today + timedelta(days=days_ahead)
+
+        text = _YEAR_PAIR.sub(lambda m: m.group("century") + m.group("rest"), text)
+        for pattern in (_ISO_DATE, _DAY_MONTH, _MONTH_DAY, _NUMERIC_DATE, _DAY_SLASH_MONTH):
+            match = pattern.search(text)
+            if not match:
+                continue
+            month = match.group("month")
+            month = _MONTHS[month] if month in _MONTHS else int(month)
+            day = int(match.group("day"))
+            year = match.groupdict().get("year")
+            try:
+                if year:
+                    year = int(year)
+                    return date(year + 2000 if year < 100 else year, month, day)
+                # Without a year, the next time that day comes round.
+                candidate = date(today.year, month, day)
+                return candidate if candidate >= today else date(today.year + 1, month, day)
+            except ValueError:
+                return None
+
+        match = _DAY_ONLY.search(text)
+        if match:
+            # The next time that day of the month comes round, skipping months too short for it.
+            day = int(match.group("day") or match.group("day2"))
+            if not 1 <= day <= 31:
+                return None
+            year, month = today.year, today.month
+            for _ in range(13):
+                try:
+                    candidate = date(year, month, day)
+                except ValueError:
+                    candidate = None
+                if candidate is not None and candidate >= today:
+                    return candidate
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return None
+
+    def _without_dates(self, text: str) -> str:
+        """The text with dates removed, so the day in "16 May" is not read as a time."""
+        text = _YEAR_PAIR.sub(lambda m: m.group("century") + m.group("rest"), self.normalize(text))
+        for pattern in (_RELATIVE_DAYS, _ISO_DATE, _DAY_MONTH, _MONTH_DAY, _NUMERIC_DATE, _DAY_SLASH_MONTH, _DAY_ONLY):
+            text = pattern.sub(" ", text)
+        return text
+
+    def _names_date(self, text: str) -> bool:
+        """True if the text says more than a time, i.e. it is meant to name a date."""
+        text = self.normalize(text)
+        for pattern in (_RELATIVE_TIME, _NOON, _PAST_TO, _MILITARY, _CLOCK, _PART_OF_DAY):
+            text = pattern.sub(" ", text)
+        return any(word not in _TIME_FILLER for word in re.findall(r"[a-z0-9']+", text))
+
+    def part_of_day(self, text: str) -> str | None:
+        """The part of the day named in the text ("tonight", "evening"), or None."""
+        match = _PART_OF_DAY.search(self.normalize(text))
+        return match.group("part") if match else None
+
+    def parse_time(self, text: str, part: str = None) -> tuple | None:
+        """
+        (hour, minute) on a 24-hour clock for the time in the text, or None. part is the part of the day said
+        elsewhere, as in ("tonight", "9"); one named in the text itself takes precedence.
+        """
+        text = self.normalize(text)
+
+        match = _NOON.search(text)
+        if match:
+            return (0, 0) if match.group("word") == "midnight" else (12, 0)
+
+        part = self.part_of_day(text) or part
+
+        match = _PAST_TO.search(text)
+        if match:
+            minutes = {"half": 30, "quarter": 15}.get(match.group("fraction")) or int(match.group("minutes") or 0)
+            hour = int(match.group("hour"))
+            if match.group("direction") in ("to", "before"):
+                hour, minutes = (hour - 1) % 24, 60 - minutes
+            meridiem = re.search(r"\b([ap])\.?\s?m\b", text)
+            hour = _hour_24(hour, meridiem.group(1) + "m" if meridiem else None, part)
+            return (hour, minutes) if hour is not None and 0 <= minutes < 60 else None
+
+        match = _MILITARY.search(text)
+        if match:
+            return int(match.group("hour")), int(match.group("minute"))
+
+        for match in _CLOCK.finditer(text):
+            minute = match.group("minute") or match.group("minute_digit") or "0"
+            hour = _hour_24(int(match.group("hour")), match.group("meridiem"), match.group("part") or part)
+            if hour is not None and int(minute) < 60:
+                return hour, int(minute)
+
+        if part:
+            return PART_OF_DAY_HOURS[part], 0
+        return None
+
+    def parse_relative(self, text: str, now: datetime = None) -> datetime | None:
+        """now plus an offset like "in 20 minutes" or "in an hour and a half", or None."""
+        text = self.normalize(text)
+        match = _RELATIVE_TIME.search(text)
+        if not match:
+            return None
+        amount = _amount(match.group("amount"))
+        minutes = amount * (60 if match.group("unit") in ("hour", "hr") else 1)
+        if match.group("half_before") or match.group("half_after"):
+            minutes += 30 if match.group("unit") in ("hour", "hr") else 0
+        return (now or self.now()) + timedelta(minutes=minutes)
+
+    def parse(self, date_text: str = None, time_text: str = None, now: datetime = None) -> datetime | None:
+        """
+        Combine a date and a time into one datetime. Either text may hold both parts, as in "tomorrow at 5 PM".
+        A time without a date is taken as today, or tomorrow if that time has already passed. A date that
+        cannot be read ("next month"), or a date and time that have already passed, give None rather than a
+        guess, so the caller can ask again.
+        """
+        now = now or self.now()
+        combined = " ".join(part for part in (date_text, time_text) if part)
+        if not combined:
+            return None
+
+        relative = self.parse_relative(combined, now)
+        if relative is not None:
+            return relative.replace(second=0, microsecond=0)
+
+        date_phrase = date_text
+        weekday = _WEEKDAY_PATTERN.search(self.normalize(time_text)) if date_text and time_text else None
+        if weekday:
+            # The day may be said with the time: ("next week", "monday 9 am").
+            date_phrase = f"{date_text} {weekday.group(0)}"
+        day = self.parse_date(date_phrase, now) if date_phrase else None
+        day = day or (self.parse_date(time_text, now) if time_text else None)
+        part = self.part_of_day(date_text) if date_text else None
+        clock = self.parse_time(time_text, part) if time_text else None
+        clock = clock or (self.parse_time(self._without_dates(date_text)) if date_text else None)
+        if clock is None or (day is None and date_text and self._names_date(date_text)):
+            return None
+        result = datetime.combine(day or now.date(), datetime.min.time()).replace(hour=clock[0], minute=clock[1])
+        if day is None and result <= now:
+            result += timedelta(days=1)
+        return result if result > now else None